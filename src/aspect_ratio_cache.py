@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片宽高比持久化缓存
+以(路径, 修改时间)为键将图片原始尺寸保存到缩略图缓存目录下的SQLite数据库，
+程序重启后无需再逐张打开图片探测尺寸
+"""
+
+import os
+import queue
+import sqlite3
+import logging
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+class AspectRatioCache:
+    """图片尺寸持久化缓存"""
+
+    DB_NAME = 'aspect.db'
+    # SQLite单条语句允许的参数数量有限，分批查询
+    _QUERY_CHUNK = 500
+
+    def __init__(self, cache_dir: str):
+        self.db_path = os.path.join(cache_dir, self.DB_NAME)
+        self.logger = logging.getLogger(__name__)
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接
+
+        每次操作使用独立的短连接：既可在工作线程中使用，
+        也不会长期占用文件导致清除缓存目录失败
+        """
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS aspect("
+            "path TEXT PRIMARY KEY, mtime REAL, w INTEGER, h INTEGER)"
+        )
+        return conn
+
+    def load(self, paths: List[str]) -> Dict[str, Tuple[float, int, int]]:
+        """批量读取图片尺寸条目 {路径: (修改时间, 宽, 高)}
+
+        整个图片列表只需查询一次；修改时间不在这里校验，
+        由调用方在真正使用某个条目时通过current_size检查
+        """
+        result = {}
+        if not paths:
+            return result
+
+        try:
+            with closing(self._connect()) as conn:
+                for i in range(0, len(paths), self._QUERY_CHUNK):
+                    chunk = paths[i:i + self._QUERY_CHUNK]
+                    placeholders = ','.join('?' * len(chunk))
+                    for path, mtime, width, height in conn.execute(
+                        f"SELECT path, mtime, w, h FROM aspect WHERE path IN ({placeholders})",
+                        chunk
+                    ):
+                        result[path] = (mtime, width, height)
+        except sqlite3.Error as e:
+            self.logger.warning(f"读取宽高比缓存失败: {e}")
+
+        return result
+
+    @staticmethod
+    def current_size(path: str, entry: Tuple[float, int, int]) -> Optional[Tuple[int, int]]:
+        """条目的修改时间与文件一致时返回 (宽, 高)，否则返回None"""
+        mtime, width, height = entry
+        try:
+            if os.path.getmtime(path) == mtime:
+                return width, height
+        except OSError:
+            pass
+        return None
+
+    def store(self, entries: Iterable[Tuple[str, float, int, int]]) -> None:
+        """批量写入 (路径, 修改时间, 宽, 高)"""
+        entries = list(entries)
+        if not entries:
+            return
+
+        try:
+            with closing(self._connect()) as conn:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO aspect(path, mtime, w, h) VALUES (?, ?, ?, ?)",
+                        entries
+                    )
+        except sqlite3.Error as e:
+            self.logger.warning(f"写入宽高比缓存失败: {e}")
+
+class AspectRatioProbeWorker(QThread):
+    """后台探测图片尺寸并写入持久化缓存
+
+    每个瀑布流组件只使用一个线程，待探测的路径按批放入队列，
+    每处理完一批发射一次结果
+    """
+
+    sizes_ready = pyqtSignal(dict)  # {路径: (宽, 高)}
+
+    def __init__(self, cache: AspectRatioCache):
+        super().__init__()
+        self.cache = cache
+        self._queue = queue.Queue()
+        self._stop_requested = False
+
+    def enqueue(self, paths: List[str]):
+        """加入一批待探测的路径"""
+        if paths:
+            self._queue.put(list(paths))
+
+    def clear_pending(self):
+        """丢弃尚未开始处理的批次（图片列表已重置）"""
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def run(self):
+        """运行线程"""
+        from PIL import Image
+
+        while not self._stop_requested:
+            paths = self._queue.get()
+            if paths is None:
+                break
+
+            sizes = {}
+            entries = []
+            for path in paths:
+                if self._stop_requested:
+                    break
+                try:
+                    mtime = os.path.getmtime(path)
+                    with Image.open(path) as img:
+                        width, height = img.size
+                    if width > 0:
+                        sizes[path] = (width, height)
+                        entries.append((path, mtime, width, height))
+                except Exception:
+                    continue
+
+            self.cache.store(entries)
+
+            if sizes and not self._stop_requested:
+                self.sizes_ready.emit(sizes)
+
+    def stop(self):
+        """停止线程"""
+        self._stop_requested = True
+        self.clear_pending()
+        self._queue.put(None)
@@ -31,6 +31,8 @@ class ConfigManager:
             
         self.config = self._load_config()
         self.logger = logging.getLogger(__name__)
+        # 配置版本号，每次修改后递增，供调用方判断缓存的配置快照是否过期
+        self.version = 0
     
     def _load_config(self) -> Dict[str, Any]:
         """加载配置文件"""
@@ -71,6 +73,7 @@ class ConfigManager:
     def update_config(self, updates: Dict[str, Any]) -> None:
         """更新配置"""
         self.config.update(updates)
+        self.version += 1
         self.save_config()
     
     def save_config(self) -> None:
@@ -88,4 +91,5 @@ class ConfigManager:
     def set(self, key: str, value: Any) -> None:
         """设置单个配置项"""
         self.config[key] = value
+        self.version += 1
         self.save_config()
\ No newline at end of file
@@ -8,8 +8,9 @@
 import os
 import logging
 import hashlib
+import threading
 from typing import Optional, Tuple, Dict, Any
-from PIL import Image, ImageOps, ExifTags
+from PIL import Image, ImageOps, ExifTags, ImageColor, ImageFilter
 from PIL.ExifTags import TAGS
 import rawpy
 import numpy as np
@@ -23,6 +24,13 @@ warnings.filterwarnings('ignore', message='.*Old-style JPEG.*')
 warnings.filterwarnings('ignore', message='.*Photometric tag.*')
 warnings.filterwarnings('ignore', message='.*SamplesPerPixel.*')
 
+# 预烘焙阴影的偏移，与原QGraphicsDropShadowEffect一致
+SHADOW_OFFSET = 2
+
+def shadow_padding(shadow: Optional[Tuple[int, str]]) -> int:
+    """预烘焙阴影在缩略图四周扩展的边距，没有阴影时为0"""
+    return shadow[0] + SHADOW_OFFSET if shadow else 0
+
 class ImageProcessor:
     """图片处理器类 - 性能优化版"""
     
@@ -40,24 +48,91 @@ class ImageProcessor:
         self._ensure_cache_dir()
         
         # 性能优化点1：添加内存缓存
-        self._thumbnail_cache = {}
         self._size_cache = {}
-        self._max_cache_entries = 500  # 最大缓存条目数
+        
+        # 性能优化点：启动时扫描一次缓存目录，之后用集合判断缓存文件是否存在，避免逐个stat
+        self._cache_present = self._scan_cache_dir()
+        # 每张图片只保留一个缓存版本 {文件哈希: {缓存文件名}}，生成新版本时删除旧版本
+        self._variants_lock = threading.Lock()
+        self._cache_variants = self._index_variants(self._cache_present)
     
     def _ensure_cache_dir(self):
         """确保缓存目录存在"""
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
     
+    def _scan_cache_dir(self) -> set:
+        """扫描缓存目录，返回已存在的缓存文件名集合"""
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                return {entry.name for entry in entries if entry.is_file()}
+        except OSError as e:
+            self.logger.warning(f"扫描缓存目录失败 {self.cache_dir}: {e}")
+            return set()
+    
+    @staticmethod
+    def _variant_key(cache_name: str) -> Optional[str]:
+        """缓存文件名中的图片哈希部分，不是缩略图缓存时返回None"""
+        file_hash, sep, _ = cache_name.partition('_')
+        return file_hash if sep and len(file_hash) == 32 else None
+    
+    def _index_variants(self, cache_names) -> Dict[str, set]:
+        """按图片哈希分组缓存文件名"""
+        variants = {}
+        for name in cache_names:
+            key = self._variant_key(name)
+            if key:
+                variants.setdefault(key, set()).add(name)
+        return variants
+    
+    def _register_cache_file(self, cache_path: str):
+        """记录新写入的缓存文件，并删除同一图片的其他尺寸或阴影版本"""
+        name = os.path.basename(cache_path)
+        key = self._variant_key(name)
+        stale = ()
+        if key:
+            with self._variants_lock:
+                names = self._cache_variants.setdefault(key, set())
+                stale = names - {name}
+                names.clear()
+                names.add(name)
+        
+        for old_name in stale:
+            self._cache_present.discard(old_name)
+            try:
+                os.remove(os.path.join(self.cache_dir, old_name))
+            except OSError:
+                pass
+        self._mark_cached(cache_path)
+    
+    def has_cached_thumbnail(self, cache_path: str) -> bool:
+        """判断缓存文件是否存在，不访问文件系统"""
+        return os.path.basename(cache_path) in self._cache_present
+    
+    def _mark_cached(self, cache_path: str, present: bool = True):
+        """记录缓存文件写入或失效"""
+        if present:
+            self._cache_present.add(os.path.basename(cache_path))
+        else:
+            self._cache_present.discard(os.path.basename(cache_path))
+    
     def is_supported_format(self, file_path: str) -> bool:
         """检查文件格式是否支持"""
         ext = os.path.splitext(file_path)[1].lower()
         return ext in self.SUPPORTED_FORMATS
     
-    def _get_cache_path(self, file_path: str, size: int) -> str:
-        """获取缓存文件路径"""
+    def _get_cache_path(self, file_path: str, size: int,
+                        shadow: Optional[Tuple[int, str]] = None) -> str:
+        """获取缓存文件路径
+
+        shadow为(阴影大小, 阴影颜色)时返回预烘焙阴影的PNG缓存路径
+        """
         file_hash = hashlib.md5(file_path.encode()).hexdigest()
-        cache_name = f"{file_hash}_{size}.jpg"
+        if shadow:
+            shadow_size, shadow_color = shadow
+            cache_name = f"{file_hash}_{size}_shadow_{shadow_size}_{shadow_color.lstrip('#').lower()}.png"
+        else:
+            cache_name = f"{file_hash}_{size}.jpg"
         return os.path.join(self.cache_dir, cache_name)
     
     def _load_raw_image(self, file_path: str, fast_mode: bool = False) -> Optional[Image.Image]:
@@ -267,32 +342,24 @@ class ImageProcessor:
         else:
             return self._load_standard_image(file_path)
     
-    def generate_thumbnail(self, file_path: str, size: int = 200, fast_mode: bool = False) -> Optional[str]:
-        """生成缩略图 - 性能优化版"""
-        # 性能优化点4：检查内存缓存
-        cache_key = f"{file_path}_{size}_{fast_mode}"
-        if cache_key in self._thumbnail_cache:
-            return self._thumbnail_cache[cache_key]
-        
-        cache_path = self._get_cache_path(file_path, size)
-        
-        # 检查磁盘缓存是否存在且有效
-        if os.path.exists(cache_path):
+    def _is_cache_valid(self, cache_path: str, file_path: str) -> bool:
+        """磁盘缓存存在且不早于原图"""
+        if not self.has_cached_thumbnail(cache_path):
+            return False
+        try:
+            return os.path.getmtime(cache_path) >= os.path.getmtime(file_path)
+        except OSError:
+            # 如果无法获取文件时间，删除缓存重新生成
+            self._mark_cached(cache_path, False)
             try:
-                cache_time = os.path.getmtime(cache_path)
-                file_time = os.path.getmtime(file_path)
-                if cache_time >= file_time:
-                    # 添加到内存缓存
-                    self._add_to_cache(cache_key, cache_path)
-                    return cache_path
-            except OSError:
-                # 如果无法获取文件时间，删除缓存重新生成
-                try:
-                    os.remove(cache_path)
-                except:
-                    pass
-        
-        # 生成新的缩略图
+                os.remove(cache_path)
+            except:
+                pass
+            return False
+    
+    def _create_thumbnail(self, file_path: str, size: int, fast_mode: bool,
+                          cache_path: Optional[str] = None) -> Optional[Image.Image]:
+        """从原图生成缩略图，返回内存中的缩略图；传入cache_path时同时写入磁盘缓存"""
         image = self.load_image(file_path, fast_mode)
         if image is None:
             return None
@@ -336,34 +403,78 @@ class ImageProcessor:
                 image = image.convert('RGB')
             
             # 保存缩略图，使用更好的压缩设置
-            image.save(cache_path, 'JPEG', quality=quality, optimize=True, progressive=True)
-            
-            # 添加到内存缓存
-            self._add_to_cache(cache_key, cache_path)
+            if cache_path:
+                image.save(cache_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+                self._register_cache_file(cache_path)
             
             # 缓存图片尺寸信息
             self._size_cache[file_path] = (original_width, original_height)
             
-            # 清理内存
-            image.close()
-            del image
-            
-            return cache_path
+            return image
             
         except Exception as e:
             self.logger.error(f"生成缩略图失败 {file_path}: {e}")
             return None
     
-    def _add_to_cache(self, key: str, value: str):
-        """添加到内存缓存，并管理缓存大小"""
-        # 如果缓存已满，移除最早添加的项
-        if len(self._thumbnail_cache) >= self._max_cache_entries:
-            # 简单的FIFO策略
-            oldest_key = next(iter(self._thumbnail_cache))
-            del self._thumbnail_cache[oldest_key]
+    def _bake_shadow(self, image: Image.Image, shadow: Tuple[int, str]) -> Image.Image:
+        """将阴影预烘焙到缩略图中，避免运行时使用QGraphicsDropShadowEffect"""
+        shadow_size, shadow_color = shadow
+        offset = SHADOW_OFFSET
+        padding = shadow_padding(shadow)
+        
+        image = image.convert('RGBA')
+        width, height = image.size
+        canvas_size = (width + padding * 2, height + padding * 2)
+        
+        # 在扩展的透明画布上绘制偏移后的模糊阴影
+        alpha = Image.new('L', canvas_size, 0)
+        alpha.paste(255, (padding + offset, padding + offset,
+                          padding + offset + width, padding + offset + height))
+        alpha = alpha.filter(ImageFilter.GaussianBlur(max(1, shadow_size / 2)))
+        
+        canvas = Image.new('RGBA', canvas_size, ImageColor.getrgb(shadow_color)[:3] + (0,))
+        canvas.putalpha(alpha)
+        canvas.alpha_composite(image, (padding, padding))
+        return canvas
+    
+    def generate_thumbnail_image(self, file_path: str, size: int = 200, fast_mode: bool = False,
+                                 shadow: Optional[Tuple[int, str]] = None,
+                                 cache_path: Optional[str] = None) -> Tuple[Optional[Image.Image], Optional[str]]:
+        """生成缩略图并直接返回内存中的图像和缓存路径
+
+        新生成的缩略图不再写盘后重新解码；命中磁盘缓存时在调用线程中解码。
+        cache_path为调用方已计算好的缓存路径，未传入时才计算；
+        缓存文件未能写入时返回的缓存路径为None
+        """
+        if cache_path is None:
+            cache_path = self._get_cache_path(file_path, size, shadow)
+        
+        if self._is_cache_valid(cache_path, file_path):
+            try:
+                image = Image.open(cache_path)
+                image.load()
+                return image, cache_path
+            except Exception as e:
+                self.logger.warning(f"读取缩略图缓存失败 {cache_path}: {e}")
+        
+        # 启用阴影时只缓存烘焙后的PNG，不再额外保存无阴影的JPEG
+        image = self._create_thumbnail(file_path, size, fast_mode, None if shadow else cache_path)
+        if image is None:
+            return None, None
+        
+        if not shadow:
+            return image, cache_path
         
-        # 添加新项
-        self._thumbnail_cache[key] = value
+        try:
+            shadow_image = self._bake_shadow(image, shadow)
+            shadow_image.save(cache_path, 'PNG')
+            self._register_cache_file(cache_path)
+            image.close()
+            return shadow_image, cache_path
+        except Exception as e:
+            # 阴影烘焙失败时显示无阴影的缩略图，不写入缓存，下次重新生成
+            self.logger.error(f"生成阴影缩略图失败 {file_path}: {e}")
+            return image, None
     
     def get_image_info(self, file_path: str) -> Dict[str, Any]:
         """获取图片信息 - 性能优化版"""
@@ -450,6 +561,8 @@ class ImageProcessor:
             return container_size
     
     def clear_cache(self):
-        """清除内存缓存"""
-        self._thumbnail_cache.clear()
-        self._size_cache.clear()
\ No newline at end of file
+        """清除内存缓存，并重新扫描磁盘缓存目录"""
+        self._size_cache.clear()
+        self._cache_present = self._scan_cache_dir()
+        with self._variants_lock:
+            self._cache_variants = self._index_variants(self._cache_present)
\ No newline at end of file
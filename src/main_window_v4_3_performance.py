@@ -37,6 +37,7 @@ class MainWindowPerformance(QMainWindow):
         self.total_images = 0
         self.loaded_images = 0
         self.preview_window = None
+        self._settings_dialog = None  # 设置对话框，首次打开时创建
         
         # 设置窗口属性
         self.setWindowTitle("ℒℴѵℯ时光微醉⁰ɞ图片管理器 - 性能优化版")
@@ -515,8 +516,8 @@ class MainWindowPerformance(QMainWindow):
                 QApplication.processEvents()
             
             # 使用瀑布流组件的滚动重置方法 - 第一次尝试
-            if hasattr(self, 'waterfall_widget') and hasattr(self.waterfall_widget, '_force_scroll_to_top'):
-                self.waterfall_widget._force_scroll_to_top()
+            if hasattr(self, 'waterfall_widget') and hasattr(self.waterfall_widget, '_scroll_to_top'):
+                self.waterfall_widget._scroll_to_top()
             
             if sort_type == 'name':
                 self.image_files.sort(key=lambda x: os.path.basename(x).lower())
@@ -540,16 +541,13 @@ class MainWindowPerformance(QMainWindow):
             # 重新加载瀑布流
             if hasattr(self, 'waterfall_widget'):
                 # 设置图片前先确保滚动到顶部
-                if hasattr(self.waterfall_widget, '_force_scroll_to_top'):
-                    self.waterfall_widget._force_scroll_to_top()
+                if hasattr(self.waterfall_widget, '_scroll_to_top'):
+                    self.waterfall_widget._scroll_to_top()
                 
                 self.waterfall_widget.set_images(self.image_files)
                 
                 # 设置图片后再次确保滚动到顶部 - 增加更多延迟尝试
-                if hasattr(self.waterfall_widget, '_force_scroll_to_top'):
-                    QTimer.singleShot(100, lambda: self.waterfall_widget._force_scroll_to_top())
-                    QTimer.singleShot(200, lambda: self.waterfall_widget._force_scroll_to_top())
-                    QTimer.singleShot(300, lambda: self.waterfall_widget._force_scroll_to_top())
+                self.waterfall_widget._scroll_to_top(defer=True)
                 
         except Exception as e:
             logging.error(f"排序失败: {e}")
@@ -761,15 +759,13 @@ class MainWindowPerformance(QMainWindow):
         
         if hasattr(self, 'waterfall_widget'):
             # 设置视图模式前先确保滚动到顶部
-            if hasattr(self.waterfall_widget, '_force_scroll_to_top'):
-                self.waterfall_widget._force_scroll_to_top()
+            if hasattr(self.waterfall_widget, '_scroll_to_top'):
+                self.waterfall_widget._scroll_to_top()
             
             self.waterfall_widget.set_view_mode(mode)
             
             # 设置视图模式后再次确保滚动到顶部
-            if hasattr(self.waterfall_widget, '_force_scroll_to_top'):
-                QTimer.singleShot(100, lambda: self.waterfall_widget._force_scroll_to_top())
-                QTimer.singleShot(300, lambda: self.waterfall_widget._force_scroll_to_top())
+            self.waterfall_widget._scroll_to_top(defer=True)
     
     def show_about(self):
         """显示关于信息"""
@@ -940,8 +936,8 @@ class MainWindowPerformance(QMainWindow):
             self.scroll_area.verticalScrollBar().setValue(0)
         
         # 使用瀑布流组件的滚动重置方法
-        if hasattr(self, 'waterfall_widget') and hasattr(self.waterfall_widget, '_force_scroll_to_top'):
-            self.waterfall_widget._force_scroll_to_top()
+        if hasattr(self, 'waterfall_widget') and hasattr(self.waterfall_widget, '_scroll_to_top'):
+            self.waterfall_widget._scroll_to_top()
     
     def auto_load_last_directory(self):
         """自动加载上次打开的文件夹"""
@@ -1039,8 +1035,7 @@ class MainWindowPerformance(QMainWindow):
             self.scroll_area.verticalScrollBar().setValue(0)
         
         # 使用瀑布流组件的滚动重置方法
-        if hasattr(self.waterfall_widget, '_force_scroll_to_top'):
-            QTimer.singleShot(150, lambda: self.waterfall_widget._force_scroll_to_top())
+        self.waterfall_widget._scroll_to_top(defer=True)
     
     def refresh_images(self):
         """刷新图片"""
@@ -1063,8 +1058,8 @@ class MainWindowPerformance(QMainWindow):
             if hasattr(self, 'scroll_area') and self.scroll_area:
                 self.scroll_area.verticalScrollBar().setValue(0)
             
-            if hasattr(self, 'waterfall_widget') and hasattr(self.waterfall_widget, '_force_scroll_to_top'):
-                self.waterfall_widget._force_scroll_to_top()
+            if hasattr(self, 'waterfall_widget') and hasattr(self.waterfall_widget, '_scroll_to_top'):
+                self.waterfall_widget._scroll_to_top()
             
             # 重新加载图片
             self.load_images()
@@ -1145,8 +1140,13 @@ class MainWindowPerformance(QMainWindow):
     def open_settings(self):
         """打开设置对话框"""
         try:
-            dialog = SettingsDialog(self.config_manager, self)
-            if dialog.exec_() == QDialog.Accepted:
+            # 性能优化点：复用设置对话框，再次打开时只重新加载设置值
+            if self._settings_dialog is None:
+                self._settings_dialog = SettingsDialog(self.config_manager, self)
+            else:
+                self._settings_dialog.load_settings()
+            
+            if self._settings_dialog.exec_() == QDialog.Accepted:
                 # 重新加载设置
                 self.load_settings()
         except Exception as e:
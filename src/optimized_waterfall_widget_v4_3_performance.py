@@ -7,17 +7,115 @@
 
 import os
 import sys
+import math
 import logging
 import subprocess
 import time
+import weakref
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from enum import IntEnum
+from functools import partial
 from typing import List, Optional, Dict, Tuple
+import numpy as np
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import QScrollArea  # 显式导入QScrollArea以确保类型检查正常工作
+from PyQt5 import sip
 
 # 导入文件工具模块
 from file_utils import move_to_recycle_bin
+from aspect_ratio_cache import AspectRatioCache, AspectRatioProbeWorker
+from image_processor_optimized import shadow_padding
+
+def get_shadow_params(config: Dict) -> Optional[Tuple[int, str]]:
+    """获取预烘焙阴影参数，未启用阴影时返回None"""
+    if not config.get('image_shadow', False):
+        return None
+    return (config.get('shadow_size', 5), config.get('shadow_color', '#808080'))
+
+def compute_item_heights(ratios: np.ndarray, column_width: int, padding: int,
+                         lo: float, hi: float) -> np.ndarray:
+    """向量化计算瀑布流项目高度，比例未知(NaN)时使用默认比例1.2"""
+    ratios = np.where(np.isnan(ratios), 1.2, np.clip(ratios, lo, hi))
+    return (column_width * ratios).astype(np.int64) + padding
+
+def build_thumbnail_style(config: Dict) -> str:
+    """根据外观配置生成缩略图样式表，与视图模式无关"""
+    # 基础样式 - 与optimized_waterfall_widget_v4_3.py保持一致
+    base_style = """
+        QLabel {
+            background-color: white;
+            padding: 4px;
+        }
+    """
+    
+    # 悬停样式
+    hover_style = ""
+    if config.get('hover_enabled', True):
+        hover_color = config.get('hover_color', '#e3f2fd')
+        hover_border_color = config.get('hover_border_color', '#2196f3')
+        hover_style = f"""
+        QLabel:hover {{
+            background-color: {hover_color};
+        }}
+        """
+    
+    # 边框设置 - 默认不添加边框，除非明确指定
+    if config.get('image_border', False):
+        border_width = config.get('border_width', 1)  # 减小默认边框宽度
+        border_color = config.get('border_color', '#e9ecef')
+        base_style = base_style.replace(
+            "background-color: white;",
+            f"background-color: white; border: {border_width}px solid {border_color};"
+        )
+        if hover_style and config.get('hover_enabled', True):
+            hover_border_color = config.get('hover_border_color', '#2196f3')
+            hover_style = hover_style.replace(
+                f"background-color: {config.get('hover_color', '#e3f2fd')};",
+                f"background-color: {config.get('hover_color', '#e3f2fd')}; border-color: {hover_border_color};"
+            )
+    else:
+        base_style = base_style.replace(
+            "background-color: white;",
+            "background-color: white; border: none;"
+        )
+    
+    # 圆角设置
+    if config.get('image_rounded', True):
+        rounded_size = config.get('rounded_size', 4)  # 减小默认圆角大小
+        if "border: none;" in base_style:
+            base_style = base_style.replace(
+                "border: none;",
+                f"border: none; border-radius: {rounded_size}px;"
+            )
+        else:
+            # 为有边框的样式添加圆角
+            border_width = config.get('border_width', 1)
+            border_color = config.get('border_color', '#e9ecef')
+            base_style = base_style.replace(
+                f"border: {border_width}px solid {border_color};",
+                f"border: {border_width}px solid {border_color}; border-radius: {rounded_size}px;"
+            )
+        
+        # 为悬停样式也添加圆角
+        if hover_style and "border-color:" in hover_style:
+            hover_border_color = config.get('hover_border_color', '#2196f3')
+            hover_style = hover_style.replace(
+                f"border-color: {hover_border_color};",
+                f"border-color: {hover_border_color}; border-radius: {rounded_size}px;"
+            )
+    
+    return base_style + hover_style
+
+class ThumbnailState(IntEnum):
+    """缩略图加载状态"""
+    PLACEHOLDER = 0  # 显示占位文本，等待加载
+    LOADING = 1      # 正在加载
+    LOADED = 2       # 已加载
+    CLEANED = 3      # 已加载但需要重新加载（内存清理或阴影参数变化）
+    FAILED = 4       # 加载失败
 
 class OptimizedImageThumbnail(QLabel):
     """优化的图片缩略图组件 v4.3 - 性能优化版"""
@@ -26,6 +124,14 @@ class OptimizedImageThumbnail(QLabel):
     load_completed = pyqtSignal()
     delete_requested = pyqtSignal(str)  # 删除请求信号
     
+    # 右键双击检测 - 所有缩略图共享一个定时器，记录最近一次右键点击的缩略图
+    _shared_rc_timer = None
+    _rc_target = None
+    
+    # 占位文本，所有缩略图共用同一份字符串
+    PLACEHOLDER_HTML = "等待加载...<br><br><span style='color: #cccccc; font-size: 12px;font-weight: 400; font-family: 'Microsoft YaHei';'>ℒℴѵℯ时光微醉⁰ɞ</span>"
+    LOADING_HTML = "照片正在加载中...<br><br><span style='color: #cccccc; font-size: 12px;font-weight: 400; font-family: 'Microsoft YaHei';'>ℒℴѵℯ时光微醉⁰ɞ</span>"
+    
     def __init__(self, image_path: str, index: int, image_processor, config_manager):
         super().__init__()
         self.image_path = image_path
@@ -36,16 +142,18 @@ class OptimizedImageThumbnail(QLabel):
         self.loading = False
         self.worker = None
         self.loaded = False
+        self.state = ThumbnailState.PLACEHOLDER
+        self.cache_path = None
+        self.display_scaled = False  # pixmap已由工作线程缩小到显示尺寸
+        self._canvas = None  # 复用的显示画布，尺寸变化时才重新分配
         
         # 图片尺寸缓存 - 性能优化点1：缓存图片尺寸信息，避免重复计算
         self.image_size = None
         self.aspect_ratio = None
-        
-        # 右键双击相关
-        self.right_click_timer = QTimer()
-        self.right_click_timer.setSingleShot(True)
-        self.right_click_timer.timeout.connect(self.handle_right_double_click)
-        self.right_click_count = 0
+        self.aspect_pending = False  # 尺寸正在后台探测中
+        # 缓存图四周预烘焙阴影的边距，及含边距的长边长度，用于还原图片本身的比例
+        self.shadow_padding = 0
+        self.padded_edge = 0
         
         self.setCursor(Qt.PointingHandCursor)
         self.setScaledContents(False)
@@ -55,7 +163,7 @@ class OptimizedImageThumbnail(QLabel):
         self.setToolTip(filename)
         
         # 设置初始状态
-        self.setText("等待加载...<br><br><span style='color: #cccccc; font-size: 12px;font-weight: 400; font-family: 'Microsoft YaHei';'>ℒℴѵℯ时光微醉⁰ɞ</span>")
+        self.set_placeholder(self.PLACEHOLDER_HTML)
         self.setStyleSheet("""
             QLabel {
                 background-color: white;
@@ -76,97 +184,26 @@ class OptimizedImageThumbnail(QLabel):
         # 设置焦点策略以接收键盘事件
         self.setFocusPolicy(Qt.StrongFocus)
     
+    def get_config(self) -> Dict:
+        """获取配置 - 优先读取所在布局的配置快照，避免每个缩略图各自复制配置"""
+        parent_widget = self.parentWidget()
+        layout = getattr(parent_widget, 'layout', None)
+        if isinstance(layout, OptimizedWaterfallLayout):
+            return layout.config_snapshot()
+        return self.config_manager.get_config()
+    
     def apply_appearance_settings(self):
         """应用外观设置"""
         try:
-            config = self.config_manager.get_config()
+            config = self.get_config()
             
-            # 基础样式 - 与optimized_waterfall_widget_v4_3.py保持一致
-            base_style = """
-                QLabel {
-                    background-color: white;
-                    padding: 4px;
-                }
-            """
-            
-            # 悬停样式
-            hover_style = ""
-            if config.get('hover_enabled', True):
-                hover_color = config.get('hover_color', '#e3f2fd')
-                hover_border_color = config.get('hover_border_color', '#2196f3')
-                hover_style = f"""
-                QLabel:hover {{
-                    background-color: {hover_color};
-                }}
-                """
-            
-            # 边框设置 - 默认不添加边框，除非明确指定
-            if config.get('image_border', False):
-                border_width = config.get('border_width', 1)  # 减小默认边框宽度
-                border_color = config.get('border_color', '#e9ecef')
-                base_style = base_style.replace(
-                    "background-color: white;",
-                    f"background-color: white; border: {border_width}px solid {border_color};"
-                )
-                if hover_style and config.get('hover_enabled', True):
-                    hover_border_color = config.get('hover_border_color', '#2196f3')
-                    hover_style = hover_style.replace(
-                        f"background-color: {config.get('hover_color', '#e3f2fd')};",
-                        f"background-color: {config.get('hover_color', '#e3f2fd')}; border-color: {hover_border_color};"
-                    )
-            else:
-                base_style = base_style.replace(
-                    "background-color: white;",
-                    "background-color: white; border: none;"
-                )
-            
-            # 圆角设置
-            if config.get('image_rounded', True):
-                rounded_size = config.get('rounded_size', 4)  # 减小默认圆角大小
-                if "border: none;" in base_style:
-                    base_style = base_style.replace(
-                        "border: none;",
-                        f"border: none; border-radius: {rounded_size}px;"
-                    )
-                else:
-                    # 为有边框的样式添加圆角
-                    border_width = config.get('border_width', 1)
-                    border_color = config.get('border_color', '#e9ecef')
-                    base_style = base_style.replace(
-                        f"border: {border_width}px solid {border_color};",
-                        f"border: {border_width}px solid {border_color}; border-radius: {rounded_size}px;"
-                    )
-                
-                # 为悬停样式也添加圆角
-                if hover_style and "border-color:" in hover_style:
-                    hover_border_color = config.get('hover_border_color', '#2196f3')
-                    hover_style = hover_style.replace(
-                        f"border-color: {hover_border_color};",
-                        f"border-color: {hover_border_color}; border-radius: {rounded_size}px;"
-                    )
-            
-            # 阴影设置 - 使用QGraphicsDropShadowEffect
-            if config.get('image_shadow', False):
-                shadow_size = config.get('shadow_size', 5)
-                shadow_color = config.get('shadow_color', '#808080')
-                
-                # 创建阴影效果
-                from PyQt5.QtWidgets import QGraphicsDropShadowEffect
-                from PyQt5.QtGui import QColor
-                
-                shadow_effect = QGraphicsDropShadowEffect()
-                shadow_effect.setBlurRadius(shadow_size)
-                shadow_effect.setOffset(2, 2)  # 阴影偏移
-                shadow_effect.setColor(QColor(shadow_color))
-                
-                self.setGraphicsEffect(shadow_effect)
-            else:
-                # 移除阴影效果
-                self.setGraphicsEffect(None)
+            # 阴影已在工作线程中预烘焙到缩略图缓存，不再使用逐帧渲染的QGraphicsDropShadowEffect
+            self.setGraphicsEffect(None)
             
-            # 应用样式
-            final_style = base_style + hover_style
-            self.setStyleSheet(final_style)
+            # 应用样式，样式未变化时跳过，避免重新解析样式表
+            final_style = build_thumbnail_style(config)
+            if self.styleSheet() != final_style:
+                self.setStyleSheet(final_style)
             
         except Exception as e:
             logging.error(f"应用外观设置失败: {e}")
@@ -186,92 +223,138 @@ class OptimizedImageThumbnail(QLabel):
             # 移除阴影效果
             self.setGraphicsEffect(None)
     
-    def start_loading(self):
-        """开始加载缩略图"""
+    def start_loading(self, cache_path: Optional[str] = None):
+        """开始加载缩略图
+        
+        cache_path为瀑布流组件记忆的缓存路径，未传入时才重新计算
+        """
         if self.loading:
             return
         
         if self.loaded and self.pixmap and not hasattr(self, 'was_cleaned'):
             return
         
-        config = self.config_manager.get_config()
+        config = self.get_config()
         thumbnail_size = config.get('thumbnail_size', 200)
-        
-        # 简单缓存检查
-        cache_path = self.image_processor._get_cache_path(self.image_path, thumbnail_size)
-        if os.path.exists(cache_path):
-            self.set_thumbnail_from_cache(cache_path)
+        shadow = get_shadow_params(config)
+        self.shadow_padding = shadow_padding(shadow)
+        self.padded_edge = thumbnail_size + 2 * self.shadow_padding
+        
+        # 简单缓存检查，先查内存中已解码的图像，再查磁盘缓存
+        if cache_path is None:
+            cache_path = self.image_processor._get_cache_path(self.image_path, thumbnail_size, shadow)
+        if self.set_thumbnail_from_pixmap_cache(cache_path):
             return
         
+        # 磁盘缓存命中时同样在线程池中解码，不阻塞界面线程
+        cached = self.image_processor.has_cached_thumbnail(cache_path)
+        
         self.loading = True
-        self.setText("照片正在加载中...<br><br><span style='color: #cccccc; font-size: 12px;font-weight: 400; font-family: 'Microsoft YaHei';'>ℒℴѵℯ时光微醉⁰ɞ</span>")
-        self.setStyleSheet("font-size: 14px; color: #999999; font-weight: 700; letter-spacing: 3px; qproperty-alignment: AlignCenter;")
+        self.state = ThumbnailState.LOADING
+        if not cached:
+            self.set_placeholder(self.LOADING_HTML)
+            self.setStyleSheet("font-size: 14px; color: #999999; font-weight: 700; letter-spacing: 3px; qproperty-alignment: AlignCenter;")
+        
+        # 创建加载任务，直接按当前显示区域输出缩放好的图像
+        display_size = None
+        if self.width() > 10 and self.height() > 10:
+            display_size = (self.width() - 10, self.height() - 10)
         
-        # 创建工作线程
         self.worker = OptimizedThumbnailWorker(
             self.image_path, 
             thumbnail_size, 
-            self.image_processor
+            self.image_processor,
+            shadow,
+            display_size,
+            cache_path,
+            cached
         )
-        self.worker.thumbnail_ready.connect(self.set_thumbnail)
-        self.worker.error_occurred.connect(self.on_load_error)
-        self.worker.finished.connect(self.on_worker_finished)
-        self.worker.start()
-    
-    def set_thumbnail_from_cache(self, thumbnail_path: str):
-        """从缓存设置缩略图"""
-        if thumbnail_path and os.path.exists(thumbnail_path):
-            pixmap = QPixmap(thumbnail_path)
-            if not pixmap.isNull():
-                self.pixmap = pixmap
-                self.loading = False
-                self.loaded = True
-                self.setText("")
-                
-                if hasattr(self, 'was_cleaned'):
-                    delattr(self, 'was_cleaned')
-                
-                # 性能优化点2：缓存图片尺寸和比例
-                self.cache_image_size(pixmap)
-                
-                self.original_loaded = True
-                self.update_display()
-                # 重要：发射加载完成信号
-                self.load_completed.emit()
-    
-    def set_thumbnail(self, thumbnail_path: str):
-        """设置缩略图"""
-        if thumbnail_path and os.path.exists(thumbnail_path):
-            pixmap = QPixmap(thumbnail_path)
+        self.worker.signals.thumbnail_ready.connect(self.set_thumbnail)
+        self.worker.signals.error_occurred.connect(self.on_load_error)
+        self.worker.signals.finished.connect(self.on_worker_finished)
+        OptimizedThumbnailWorker.thread_pool().start(self.worker)
+    
+    def set_placeholder(self, html: str):
+        """显示占位文本，内容未变化时跳过，避免QLabel重新解析富文本"""
+        if self.text() != html:
+            self.setText(html)
+    
+    @staticmethod
+    def pixmap_cache_key(thumbnail_path: str, display_scaled: bool) -> str:
+        """共享QPixmapCache中的键，已缩小到显示尺寸的图像单独存放"""
+        return f"{thumbnail_path}#scaled" if display_scaled else thumbnail_path
+    
+    def set_thumbnail_from_pixmap_cache(self, thumbnail_path: str) -> bool:
+        """从共享的QPixmapCache设置缩略图，无需重新解码，返回是否命中"""
+        for display_scaled in (False, True):
+            pixmap = QPixmapCache.find(self.pixmap_cache_key(thumbnail_path, display_scaled))
+            if pixmap is not None and not pixmap.isNull():
+                self.apply_pixmap(pixmap, thumbnail_path, display_scaled)
+                return True
+        return False
+    
+    def _from_current_worker(self) -> bool:
+        """信号是否来自当前加载任务，容器被回收复用后旧任务排队中的结果应丢弃"""
+        return self.worker is not None and self.sender() is self.worker.signals
+    
+    def set_thumbnail(self, image: QImage, thumbnail_path: str, display_scaled: bool):
+        """设置缩略图 - 直接使用工作线程解码并缩放好的图像，无需再从磁盘读取"""
+        if not self._from_current_worker():
+            return
+        if not image.isNull():
+            pixmap = QPixmap.fromImage(image)
             if not pixmap.isNull():
-                self.pixmap = pixmap
-                self.loading = False
-                self.loaded = True
-                self.setText("")
-                
-                if hasattr(self, 'was_cleaned'):
-                    delattr(self, 'was_cleaned')
-                
-                # 性能优化点2：缓存图片尺寸和比例
-                self.cache_image_size(pixmap)
-                
-                self.original_loaded = True
-                self.update_display()
-                self.load_completed.emit()
+                if thumbnail_path:
+                    QPixmapCache.insert(self.pixmap_cache_key(thumbnail_path, display_scaled), pixmap)
+                self.apply_pixmap(pixmap, thumbnail_path, display_scaled)
+    
+    def apply_pixmap(self, pixmap: QPixmap, thumbnail_path: str, display_scaled: bool):
+        """显示已解码的缩略图并发射加载完成信号"""
+        self.pixmap = pixmap
+        self.cache_path = thumbnail_path
+        self.display_scaled = display_scaled
+        self.loading = False
+        self.loaded = True
+        self.state = ThumbnailState.LOADED
+        self.setText("")
+        
+        if hasattr(self, 'was_cleaned'):
+            delattr(self, 'was_cleaned')
+        
+        # 性能优化点2：缓存图片尺寸和比例
+        self.cache_image_size(pixmap)
+        
+        self.original_loaded = True
+        self.update_display()
+        # 重要：发射加载完成信号
+        self.load_completed.emit()
+    
+    def content_size(self, pixmap) -> Tuple[float, float]:
+        """去掉预烘焙阴影边距后的图片尺寸，pixmap可能已按比例缩小"""
+        width, height = pixmap.width(), pixmap.height()
+        if self.shadow_padding and self.padded_edge:
+            # 缩略图长边固定为thumbnail_size，据此换算缩小后的边距
+            padding = self.shadow_padding * max(width, height) / self.padded_edge
+            width, height = width - 2 * padding, height - 2 * padding
+        return width, height
     
     def cache_image_size(self, pixmap):
         """缓存图片尺寸和比例 - 性能优化"""
         if pixmap and not pixmap.isNull():
-            self.image_size = (pixmap.width(), pixmap.height())
-            if pixmap.width() > 0:
-                self.aspect_ratio = pixmap.height() / pixmap.width()
+            width, height = self.content_size(pixmap)
+            self.image_size = (round(width), round(height))
+            if width > 0:
+                self.aspect_ratio = height / width
                 # 限制比例范围，避免极端情况
                 self.aspect_ratio = max(0.6, min(self.aspect_ratio, 1.8))
     
     def on_load_error(self, error_msg: str):
         """处理加载错误"""
+        if not self._from_current_worker():
+            return
         self.loading = False
         self.loaded = True
+        self.state = ThumbnailState.FAILED
         self.setText("加载失败")
         self.setStyleSheet("""
             QLabel {
@@ -285,9 +368,9 @@ class OptimizedImageThumbnail(QLabel):
         self.load_completed.emit()
     
     def on_worker_finished(self):
-        """工作线程完成"""
-        if self.worker:
-            self.worker.deleteLater()
+        """加载任务完成"""
+        # 只清除当前任务的引用，已停止的旧任务可能晚于新任务结束
+        if self.worker and self.worker.signals is self.sender():
             self.worker = None
     
     def update_display(self):
@@ -299,17 +382,9 @@ class OptimizedImageThumbnail(QLabel):
         if size.width() <= 0 or size.height() <= 0:
             return
         
-        # 获取当前视图模式
-        view_mode = 'waterfall'
-        try:
-            parent_widget = self.parent()
-            while parent_widget:
-                if hasattr(parent_widget, 'layout') and hasattr(parent_widget.layout, 'view_mode'):
-                    view_mode = parent_widget.layout.view_mode
-                    break
-                parent_widget = parent_widget.parent()
-        except:
-            pass
+        # 获取当前视图模式 - 直接读取所在布局
+        layout = getattr(self.parentWidget(), 'layout', None)
+        view_mode = getattr(layout, 'view_mode', 'waterfall')
         
         # 根据视图模式设置边距 - 优化边距设置
         if view_mode == 'grid':
@@ -326,6 +401,18 @@ class OptimizedImageThumbnail(QLabel):
         max_width = size.width() - (margin_horizontal * 2)
         max_height = size.height() - (margin_vertical * 2)
         
+        # 显示区域变大后，已缩小的图像不足以清晰显示，改用磁盘缓存中的完整缩略图
+        if (self.display_scaled and self.cache_path
+                and max_width > self.pixmap.width() and max_height > self.pixmap.height()):
+            pixmap = QPixmapCache.find(self.pixmap_cache_key(self.cache_path, False))
+            if pixmap is None:
+                pixmap = QPixmap(self.cache_path)
+                if not pixmap.isNull():
+                    QPixmapCache.insert(self.pixmap_cache_key(self.cache_path, False), pixmap)
+            self.display_scaled = False
+            if not pixmap.isNull():
+                self.pixmap = pixmap
+        
         if max_width > 0 and max_height > 0:
             # 始终使用高质量缩放以解决模糊问题
             transform_method = Qt.SmoothTransformation
@@ -337,9 +424,12 @@ class OptimizedImageThumbnail(QLabel):
                 transform_method
             )
             
-            # 创建结果画布
-            result_pixmap = QPixmap(size.width(), size.height())
-            result_pixmap.fill(Qt.transparent)
+            # 复用结果画布，先释放标签持有的引用，避免绘制时触发写时复制
+            self.clear()
+            if self._canvas is None or self._canvas.size() != size:
+                self._canvas = QPixmap(size)
+            self._canvas.fill(Qt.transparent)
+            result_pixmap = self._canvas
             
             painter = QPainter(result_pixmap)
             
@@ -369,17 +459,29 @@ class OptimizedImageThumbnail(QLabel):
                 self.clicked.emit(self.image_path, self.index)
         elif event.button() == Qt.RightButton:
             # 处理右键双击
-            self.right_click_count += 1
-            if self.right_click_count == 1:
-                self.right_click_timer.start(300)  # 300ms内检测双击
-            elif self.right_click_count == 2:
-                self.right_click_timer.stop()
-                self.right_click_count = 0
+            cls = OptimizedImageThumbnail
+            timer = cls.shared_right_click_timer()
+            if timer.isActive() and cls._rc_target is self:
+                timer.stop()
+                cls._rc_target = None
                 self.open_file_location()
+            else:
+                cls._rc_target = self
+                timer.start(300)  # 300ms内检测双击
+    
+    @classmethod
+    def shared_right_click_timer(cls) -> QTimer:
+        """获取共享的右键双击定时器，首次使用时创建"""
+        if cls._shared_rc_timer is None:
+            cls._shared_rc_timer = QTimer()
+            cls._shared_rc_timer.setSingleShot(True)
+            cls._shared_rc_timer.timeout.connect(cls.handle_right_double_click)
+        return cls._shared_rc_timer
     
-    def handle_right_double_click(self):
+    @classmethod
+    def handle_right_double_click(cls):
         """处理右键双击超时"""
-        self.right_click_count = 0
+        cls._rc_target = None
     
     def open_file_location(self):
         """打开文件所在目录并定位到文件"""
@@ -470,55 +572,198 @@ class OptimizedImageThumbnail(QLabel):
     def cleanup(self):
         """清理资源"""
         if self.worker:
-            self.worker.terminate()
-            self.worker.wait()
-            self.worker.deleteLater()
+            # 线程池任务无法强制终止，标记停止并断开信号，已排队的结果也不再送达
+            self.worker.stop()
+            for signal in (self.worker.signals.thumbnail_ready,
+                           self.worker.signals.error_occurred,
+                           self.worker.signals.finished):
+                try:
+                    signal.disconnect()
+                except TypeError:
+                    pass
             self.worker = None
 
-class OptimizedThumbnailWorker(QThread):
-    """优化的缩略图加载工作线程"""
+class _ThumbnailWorkerSignals(QObject):
+    """缩略图加载任务的信号"""
     
-    thumbnail_ready = pyqtSignal(str)
+    thumbnail_ready = pyqtSignal(QImage, str, bool)  # 图像, 缓存路径, 是否已缩小到显示尺寸
     error_occurred = pyqtSignal(str)
+    finished = pyqtSignal()
+
+class OptimizedThumbnailWorker(QRunnable):
+    """优化的缩略图加载任务，在共享线程池中运行"""
     
-    def __init__(self, image_path: str, size: int, image_processor):
+    _pool = None
+    
+    @classmethod
+    def thread_pool(cls) -> QThreadPool:
+        """所有缩略图共享的线程池，线程数与CPU核心数一致"""
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(os.cpu_count() or 4)
+        return cls._pool
+    
+    def __init__(self, image_path: str, size: int, image_processor, shadow=None, display_size=None,
+                 cache_path=None, cached=False):
         super().__init__()
         self.image_path = image_path
         self.size = size
         self.image_processor = image_processor
+        self.shadow = shadow  # (阴影大小, 阴影颜色)，None表示不烘焙阴影
+        self.display_size = display_size  # (最大宽度, 最大高度)
+        self.cache_path = cache_path  # 缩略图缓存路径
+        self.cached = cached  # 磁盘缓存是否已存在，不存在时需要生成
+        self.signals = _ThumbnailWorkerSignals()
         self._stop_requested = False
     
     def run(self):
-        """运行线程"""
+        """运行任务"""
         try:
             if self._stop_requested:
                 return
             
-            thumbnail_path = self.image_processor.generate_thumbnail(
-                self.image_path, self.size, fast_mode=True  # 性能优化点4：使用快速模式生成缩略图
+            # 性能优化点：磁盘缓存用QImageReader按显示尺寸直接解码
+            if self.cached:
+                qimage, display_scaled = self.read_cached_image(self.cache_path)
+                if self._stop_requested:
+                    return
+                if qimage is not None:
+                    self.signals.thumbnail_ready.emit(qimage, self.cache_path, display_scaled)
+                    return
+                # 缓存文件已被外部删除或损坏，更新记录后重新生成
+                self.image_processor._mark_cached(self.cache_path, False)
+            
+            image, thumbnail_path = self.image_processor.generate_thumbnail_image(
+                self.image_path, self.size, fast_mode=True,  # 性能优化点4：使用快速模式生成缩略图
+                shadow=self.shadow, cache_path=self.cache_path
             )
             
             if self._stop_requested:
                 return
             
-            if thumbnail_path:
-                self.thumbnail_ready.emit(thumbnail_path)
+            if image is not None:
+                qimage, display_scaled = self.to_display_image(image)
+                image.close()
+                # 缓存文件未写入时路径为空，界面只显示内存中的图像
+                self.signals.thumbnail_ready.emit(qimage, thumbnail_path or '', display_scaled)
             else:
-                self.error_occurred.emit("无法生成缩略图")
+                self.signals.error_occurred.emit("无法生成缩略图")
         except Exception as e:
             if not self._stop_requested:
                 error_msg = f"生成缩略图失败: {str(e)}"
                 logging.error(error_msg)
-                self.error_occurred.emit(error_msg)
+                self.signals.error_occurred.emit(error_msg)
+        finally:
+            try:
+                self.signals.finished.emit()
+            except RuntimeError:
+                pass
+    
+    def _display_target(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """按显示区域计算缩小后的尺寸，与Qt.KeepAspectRatio一致；无需缩小时返回None"""
+        if not self.display_size or width <= 0 or height <= 0:
+            return None
+        
+        max_width, max_height = self.display_size
+        scaled_width = max_height * width // height
+        if scaled_width <= max_width:
+            target = (scaled_width, max_height)
+        else:
+            target = (max_width, max_width * height // width)
+        
+        # 只缩小不放大，放大交给界面按需处理
+        if 0 < target[0] < width and 0 < target[1] < height:
+            return target
+        return None
+    
+    def read_cached_image(self, cache_path: str) -> Tuple[Optional[QImage], bool]:
+        """读取磁盘缓存，解码时直接缩小到显示尺寸"""
+        reader = QImageReader(cache_path)
+        target = None
+        if reader.canRead():
+            size = reader.size()
+            target = self._display_target(size.width(), size.height())
+            if target:
+                reader.setScaledSize(QSize(*target))
+        
+        qimage = reader.read()
+        if qimage.isNull():
+            return None, False
+        return qimage, target is not None
+    
+    def to_display_image(self, image):
+        """将缩略图一次性缩放到显示尺寸并转换为QImage，尺寸计算与Qt.KeepAspectRatio一致"""
+        from PIL import Image
+        
+        display_scaled = False
+        target = self._display_target(*image.size)
+        if target:
+            image = image.resize(target, Image.Resampling.BILINEAR)
+            display_scaled = True
+        
+        image = image.convert('RGBA')
+        data = image.tobytes('raw', 'RGBA')
+        qimage = QImage(data, image.width, image.height, image.width * 4, QImage.Format_RGBA8888)
+        return qimage.copy(), display_scaled
     
     def stop(self):
-        """停止线程"""
+        """停止任务"""
         self._stop_requested = True
 
+class _ScanVisibleSignals(QObject):
+    """可见区域扫描任务的信号，QRunnable本身不能发射信号"""
+    
+    finished = pyqtSignal(tuple, list)  # (尺寸, 阴影参数), [(图片路径, 缓存路径, 缓存是否存在)]
+
+class _ScanVisibleTask(QRunnable):
+    """在线程池中计算缓存路径并判断缓存是否存在，GUI线程只处理结果
+
+    任务不访问组件的缓存路径记忆表，已记忆的路径由GUI线程事先传入，
+    新算出的路径随结果发回，由GUI线程写入记忆表
+    """
+    
+    _pool = None
+    
+    @classmethod
+    def thread_pool(cls) -> QThreadPool:
+        """扫描任务专用的线程池，清理时可单独等待，不影响全局线程池中的其他任务"""
+        if cls._pool is None:
+            cls._pool = QThreadPool()
+            cls._pool.setMaxThreadCount(2)
+        return cls._pool
+    
+    def __init__(self, image_paths: List[str], size: int,
+                 shadow: Optional[Tuple[int, str]], image_processor, known_paths: Dict[str, str],
+                 signals: _ScanVisibleSignals):
+        super().__init__()
+        self.image_paths = image_paths
+        self.size = size
+        self.shadow = shadow
+        self.image_processor = image_processor
+        self.known_paths = known_paths  # 已记忆的缓存路径 {图片路径: 缓存路径}
+        self.signals = signals
+    
+    def run(self):
+        """运行任务"""
+        try:
+            decisions = []
+            for image_path in self.image_paths:
+                cache_path = self.known_paths.get(image_path)
+                if cache_path is None:
+                    cache_path = self.image_processor._get_cache_path(image_path, self.size, self.shadow)
+                decisions.append((image_path, cache_path,
+                                  self.image_processor.has_cached_thumbnail(cache_path)))
+            self.signals.finished.emit((self.size, self.shadow), decisions)
+        except RuntimeError:
+            # 所属控件已销毁
+            pass
+        except Exception as e:
+            logging.error(f"扫描可见区域失败: {e}")
+
 class OptimizedWaterfallLayout(QLayout):
     """优化的瀑布流布局 - 性能优化版"""
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, config_manager=None):
         super().__init__(parent)
         self.items = []
         self.column_count = 0
@@ -531,11 +776,54 @@ class OptimizedWaterfallLayout(QLayout):
         self._cached_layout_width = 0     # 缓存布局宽度
         self._cached_layout_height = 0    # 缓存布局高度
         self._layout_dirty = True         # 布局是否需要重新计算
+        
+        # 按项目顺序记录的顶部坐标和底部坐标前缀最大值，二者都单调不减，可直接二分查找
+        # 瀑布流总是放入最短列，因此后一项的顶部不会高于前一项
+        self._item_tops = []
+        self._item_bottoms_max = []
+        
+        # 批量插入期间不逐项标记布局失效，结束时统一失效一次
+        self._bulk_insert = False
+        
+        # 配置快照，按配置版本号刷新，每次布局只读取一次配置
+        self.config_manager = config_manager
+        self._cfg_snapshot = None
+        self._cfg_version = -1
+    
+    def config_snapshot(self) -> Dict:
+        """获取配置快照 - 配置未修改时直接复用，不再重复复制配置"""
+        config_manager = self.config_manager
+        if config_manager is None:
+            return {}
+        
+        version = getattr(config_manager, 'version', None)
+        if self._cfg_snapshot is None or version is None or version != self._cfg_version:
+            self._cfg_snapshot = config_manager.get_config()
+            self._cfg_version = version
+        return self._cfg_snapshot
+    
+    def get_item_tops(self) -> List[int]:
+        """获取各项目顶部坐标（单调不减）"""
+        return self._item_tops
+    
+    def get_item_bottoms_max(self) -> List[int]:
+        """获取各项目底部坐标的前缀最大值（单调不减）"""
+        return self._item_bottoms_max
+    
+    def begin_bulk_insert(self):
+        """开始批量插入项目"""
+        self._bulk_insert = True
+    
+    def end_bulk_insert(self):
+        """结束批量插入项目，统一使布局失效一次"""
+        self._bulk_insert = False
+        self.invalidate()
     
     def addItem(self, item):
         """添加项目"""
         self.items.append(item)
-        self._layout_dirty = True
+        if not self._bulk_insert:
+            self._layout_dirty = True
     
     def count(self):
         """项目数量"""
@@ -560,6 +848,18 @@ class OptimizedWaterfallLayout(QLayout):
             return item
         return None
     
+    def clear_items(self):
+        """一次性移除所有项目，不处理项目中的控件"""
+        for item in self.items:
+            # 与takeAt一致，将项目所有权交还Python，释放引用后即被销毁
+            sip.transferback(item)
+        self.items = []
+        self._cached_item_positions.clear()
+        self._cached_item_heights.clear()
+        self._item_tops = []
+        self._item_bottoms_max = []
+        self.invalidate()
+    
     def setGeometry(self, rect):
         """设置几何形状"""
         super().setGeometry(rect)
@@ -586,57 +886,68 @@ class OptimizedWaterfallLayout(QLayout):
     
     def calculate_item_height(self, widget, column_width):
         """计算项目高度 - 性能优化版"""
-        # 检查缓存
-        widget_id = id(widget)
-        if widget_id in self._cached_item_heights:
-            return self._cached_item_heights[widget_id]
-        
-        # 设置固定的padding为5像素，不随窗口大小变化
-        padding = 5  # 图片与容器边框之间的固定间距，保持不变
+        return self.calculate_item_heights([widget], column_width)[0]
+    
+    def _source_aspect_ratio(self, widget):
+        """获取项目的原始宽高比，返回(比例, 是否可缓存)，比例未知时为NaN"""
+        # 瀑布流模式：优先使用缓存的图片比例
+        if getattr(widget, 'aspect_ratio', None) is not None:
+            return widget.aspect_ratio, True
         
-        if self.view_mode == 'grid':
-            height = column_width + padding
-            self._cached_item_heights[widget_id] = height
-            return height
+        # 如果已经加载了缩略图，使用缩略图比例（不含阴影边距）
+        pixmap = getattr(widget, 'pixmap', None)
+        if pixmap and not pixmap.isNull() and hasattr(widget, 'content_size'):
+            width, height = widget.content_size(pixmap)
+            if width > 0:
+                return height / width, True
         
-        # 瀑布流模式：优先使用缓存的图片比例
-        if hasattr(widget, 'aspect_ratio') and widget.aspect_ratio is not None:
-            calculated_height = int(column_width * widget.aspect_ratio) + padding
-            self._cached_item_heights[widget_id] = calculated_height
-            return calculated_height
-        
-        # 如果已经加载了缩略图，使用缩略图比例
-        if hasattr(widget, 'pixmap') and widget.pixmap and not widget.pixmap.isNull():
-            original_width = widget.pixmap.width()
-            original_height = widget.pixmap.height()
-            if original_width > 0:
-                aspect_ratio = original_height / original_width
-                # 允许更大范围的宽高比，以保持图片原始比例
-                aspect_ratio = max(0.4, min(aspect_ratio, 2.5))
-                calculated_height = int(column_width * aspect_ratio) + padding
-                self._cached_item_heights[widget_id] = calculated_height
-                return calculated_height
+        # 尺寸正在后台探测，暂用默认高度且不缓存，探测完成后重新布局
+        if getattr(widget, 'aspect_pending', False):
+            return math.nan, False
         
         # 尝试从图片文件获取比例
-        if hasattr(widget, 'image_path') and widget.image_path:
+        if getattr(widget, 'image_path', None):
             try:
                 from PIL import Image
                 with Image.open(widget.image_path) as img:
                     width, height = img.size
                     if width > 0:
-                        aspect_ratio = height / width
-                        # 允许更大范围的宽高比，以保持图片原始比例
-                        aspect_ratio = max(0.4, min(aspect_ratio, 2.5))
-                        calculated_height = int(column_width * aspect_ratio) + padding
-                        self._cached_item_heights[widget_id] = calculated_height
-                        return calculated_height
+                        return height / width, True
             except Exception:
                 pass
         
         # 默认使用黄金比例
-        default_height = int(column_width * 1.2) + padding
-        self._cached_item_heights[widget_id] = default_height
-        return default_height
+        return math.nan, True
+    
+    def calculate_item_heights(self, widgets, column_width) -> List[int]:
+        """批量计算项目高度 - 未缓存的项目一次性交给向量化函数计算"""
+        # 设置固定的padding为5像素，不随窗口大小变化
+        padding = 5  # 图片与容器边框之间的固定间距，保持不变
+        
+        heights = [self._cached_item_heights.get(id(widget)) for widget in widgets]
+        missing = [i for i, height in enumerate(heights) if height is None]
+        if not missing:
+            return heights
+        
+        if self.view_mode == 'grid':
+            for i in missing:
+                heights[i] = column_width + padding
+                self._cached_item_heights[id(widgets[i])] = heights[i]
+            return heights
+        
+        ratios = np.empty(len(missing), dtype=np.float64)
+        cacheable = []
+        for k, i in enumerate(missing):
+            ratios[k], can_cache = self._source_aspect_ratio(widgets[i])
+            cacheable.append(can_cache)
+        
+        # 允许更大范围的宽高比，以保持图片原始比例
+        computed = compute_item_heights(ratios, column_width, padding, 0.4, 2.5).tolist()
+        for k, i in enumerate(missing):
+            heights[i] = computed[k]
+            if cacheable[k]:
+                self._cached_item_heights[id(widgets[i])] = computed[k]
+        return heights
     
     def do_layout(self, rect):
         """执行布局 - 性能优化版"""
@@ -655,22 +966,10 @@ class OptimizedWaterfallLayout(QLayout):
         # 使用一致的边距，减少20像素以避免贴近窗口边缘
         available_width = rect.width() - 20
         
-        # 从配置获取列数设置
-        try:
-            parent_widget = self.parent()
-            while parent_widget and not hasattr(parent_widget, 'config_manager'):
-                parent_widget = parent_widget.parent()
-            
-            if parent_widget and hasattr(parent_widget, 'config_manager'):
-                config_data = parent_widget.config_manager.get_config()
-                waterfall_columns = config_data.get('waterfall_columns', 4)
-                grid_columns = config_data.get('grid_columns', 6)
-            else:
-                waterfall_columns = 4
-                grid_columns = 6
-        except:
-            waterfall_columns = 4
-            grid_columns = 6
+        # 从注入的配置管理器获取列数设置
+        config_data = self.config_snapshot()
+        waterfall_columns = config_data.get('waterfall_columns', 4)
+        grid_columns = config_data.get('grid_columns', 6)
         
         # 根据视图模式计算列数
         if self.view_mode == 'waterfall':
@@ -691,9 +990,16 @@ class OptimizedWaterfallLayout(QLayout):
         # 初始化列高度 - 与optimized_waterfall_widget_v4_3.py保持一致
         column_heights = [self.spacing_value] * columns
         
+        # 一次性计算所有项目高度 - 根据图片实际比例
+        widgets = [item.widget() for item in self.items]
+        height_iter = iter(self.calculate_item_heights([w for w in widgets if w], column_width))
+        
+        item_tops = []
+        item_bottoms_max = []
+        bottom_max = -1
+        
         # 布局每个项目
-        for item in self.items:
-            widget = item.widget()
+        for item, widget in zip(self.items, widgets):
             if not widget:
                 continue
             
@@ -705,18 +1011,23 @@ class OptimizedWaterfallLayout(QLayout):
             x = rect.x() + self.spacing_value + column_index * (column_width + self.spacing_value)
             y = rect.y() + column_heights[column_index]
             
-            # 计算高度 - 根据图片实际比例
-            height = self.calculate_item_height(widget, column_width)
+            height = next(height_iter)
             
             # 设置几何形状
             widget.setGeometry(x, y, column_width, height)
             
             # 缓存位置
             self._cached_item_positions[id(item)] = (x, y, column_width, height)
+            item_tops.append(y)
+            bottom_max = max(bottom_max, y + height - 1)
+            item_bottoms_max.append(bottom_max)
             
             # 更新列高度 - 与optimized_waterfall_widget_v4_3.py保持一致
             column_heights[column_index] += height + self.spacing_value
         
+        self._item_tops = item_tops
+        self._item_bottoms_max = item_bottoms_max
+        
         # 缓存布局高度
         self._cached_layout_height = max(column_heights) if column_heights else self.spacing_value
         
@@ -750,10 +1061,12 @@ class OptimizedWaterfallLayout(QLayout):
         # 模拟布局计算实际高度
         column_heights = [self.spacing_value] * columns
         
-        for i in range(len(self.items)):
-            widget = self.items[i].widget()
+        widgets = [item.widget() for item in self.items]
+        height_iter = iter(self.calculate_item_heights([w for w in widgets if w], column_width))
+        
+        for widget in widgets:
             if widget:
-                item_height = self.calculate_item_height(widget, column_width)
+                item_height = next(height_iter)
             else:
                 item_height = int(column_width * 1.2) + 20
             
@@ -775,6 +1088,10 @@ class OptimizedWaterfallWidget(QWidget):
     image_deleted = pyqtSignal(str)  # 图片删除信号
     image_loaded = pyqtSignal()  # 图片加载完成信号
     
+    PIXMAP_CACHE_LIMIT_KB = 256 * 1024  # 共享QPixmapCache上限（KB）
+    RECYCLE_POOL_MIN = 50  # 回收池容量下限，实际容量为测得的可见缩略图数量的两倍
+    POOL_WAIT_TIMEOUT_MS = 3000  # 清理时等待线程池中正在运行任务的最长时间
+    
     def __init__(self, image_processor, config_manager, parent=None):
         super().__init__(parent)
         self.image_processor = image_processor
@@ -783,13 +1100,22 @@ class OptimizedWaterfallWidget(QWidget):
         self.thumbnails = []
         self.current_view_mode = 'waterfall'
         
+        # 路径索引，点击和删除时按路径O(1)查找
+        self._path_to_index = {}
+        # 弱引用，查找表本身不延长缩略图的生命周期
+        self._path_to_thumbnail: "weakref.WeakValueDictionary[str, OptimizedImageThumbnail]" = weakref.WeakValueDictionary()
+        self._index_dirty = False  # 删除后索引失效，下次查找时再重建
+        
         # 恢复原始参数
         self.batch_size = 30
+        self.create_chunk_size = 10  # 按时间预算创建容器时每块的数量
+        self._create_generation = 0  # 图片列表重置后，未完成的分块创建不再继续
         self.loaded_count = 0
         self.visible_count = 0
         self.max_concurrent_workers = 6
         self.active_workers = 0
-        self.pending_loads = []
+        self.pending_loads = deque()  # 等待加载队列，从头部O(1)出队
+        self._pending_set = set()     # 与队列同步，用于O(1)去重
         self.is_loading_more = False
         
         # 定时器
@@ -804,23 +1130,56 @@ class OptimizedWaterfallWidget(QWidget):
         
         self.last_visible_range = (0, 0)
         
+        # 可见区域扫描在线程池中进行
+        self._scan_signals = _ScanVisibleSignals(self)
+        self._scan_signals.finished.connect(self._apply_lazy_loading_decisions)
+        self._resources_released = False
+        
+        # 上一次懒加载处理过的范围，滚动时只检查新进入范围的缩略图
+        self._last_load_range = (0, 0)
+        
+        # 缓存路径记忆表 {图片路径: {(尺寸, 阴影参数): 缓存路径}}，避免滚动时反复计算哈希
+        self._cache_path_cache: Dict[str, Dict[tuple, str]] = {}
+        
+        # 包含本控件的滚动区域，首次查找后缓存
+        self._cached_scroll_area = None
+        
+        # 性能优化点：已解码的缩略图放入全局共享的QPixmapCache，按字节数淘汰
+        # 被清理的缩略图滚动回来时可直接从中取回，无需重新解码
+        QPixmapCache.setCacheLimit(self.PIXMAP_CACHE_LIMIT_KB)
+        
         # 智能内存管理
         self.visible_range = (0, 0)
         self.memory_cleanup_timer = QTimer()
         self.memory_cleanup_timer.timeout.connect(self.cleanup_invisible_images)
         self.memory_cleanup_timer.start(60000)  # 恢复原始值
         
+        # 已加载缩略图的LRU，最久未使用的在前，清理时无需扫描全部缩略图
+        self._loaded_lru: "OrderedDict[OptimizedImageThumbnail, None]" = OrderedDict()
+        
         # 性能优化点9：缓存图片尺寸信息
         self.image_size_cache = {}
         
         # 性能优化点10：虚拟滚动相关
-        self.recycled_thumbnails = []  # 回收的缩略图容器
+        # 回收池容量随计算可见区域时测得的缩略图数量调整，切换视图模式后重新测量
+        self._max_visible_span = 0
+        self.recycled_thumbnails = deque(maxlen=self.RECYCLE_POOL_MIN)  # 回收的缩略图容器
+        
+        # 性能优化点17：持久化图片尺寸缓存，重启后无需逐张探测
+        self.aspect_cache = AspectRatioCache(getattr(image_processor, 'cache_dir', 'cache'))
+        self._aspect_entries = {}  # 当前图片列表的尺寸条目，每次set_images查询一次
+        self._aspect_worker = None  # 尺寸探测线程，首次需要时创建
+        
+        # 当前缩略图烘焙所用的阴影参数和样式表
+        self._applied_shadow = get_shadow_params(config_manager.get_config())
+        self._applied_style = build_thumbnail_style(config_manager.get_config())
         
         self.init_ui()
     
     def init_ui(self):
         """初始化界面"""
         self.layout = OptimizedWaterfallLayout()
+        self.layout.config_manager = self.config_manager  # 注入配置管理器，布局无需逐级查找父组件
         self.setLayout(self.layout)
         
         self.setStyleSheet("""
@@ -837,18 +1196,104 @@ class OptimizedWaterfallWidget(QWidget):
         self.clear_thumbnails()
         
         self.image_files = image_files
+        self._rebuild_index_map()
+        
+        # 性能优化点：整个图片列表只查询一次尺寸缓存，旧列表尚未探测的批次直接丢弃
+        self._aspect_entries = self.aspect_cache.load(self.image_files)
+        if self._aspect_worker is not None:
+            self._aspect_worker.clear_pending()
+        
         self.loaded_count = 0
         self.visible_count = 0
         self.active_workers = 0
         self.pending_loads.clear()
+        self._pending_set.clear()
         self.is_loading_more = False
         
         if not self.image_files:
             return
         
         initial_create_count = min(100, len(self.image_files))
-        self.create_thumbnail_containers(0, initial_create_count)
+        self._create_budgeted(initial_create_count)
+    
+    def _create_budgeted(self, end_index: int, budget_ms: int = 16, generation: Optional[int] = None):
+        """在时间预算内分块创建缩略图容器，超时后让出事件循环，下一轮继续创建"""
+        if generation is None:
+            self._create_generation += 1
+            generation = self._create_generation
+        elif generation != self._create_generation:
+            return  # 图片列表已重置
+        
+        timer = QElapsedTimer()
+        timer.start()
+        end_index = min(end_index, len(self.image_files))
+        missing_paths = []
+        
+        # 本轮的所有分块共用一次批量插入，结束后只重新布局和更新尺寸一次
+        self.setUpdatesEnabled(False)
+        self.layout.begin_bulk_insert()
+        try:
+            while self.loaded_count < end_index:
+                chunk_end = min(self.loaded_count + self.create_chunk_size, end_index)
+                self._add_thumbnail_containers(self.loaded_count, chunk_end, missing_paths)
+                if timer.elapsed() >= budget_ms:
+                    break
+        finally:
+            self.layout.end_bulk_insert()
+            self.setUpdatesEnabled(True)
+        
+        self.update_widget_size()
+        self.start_aspect_probe(missing_paths)
+        
+        # 已创建的容器先开始加载
         self.start_lazy_loading()
+        
+        if self.loaded_count < end_index:
+            QTimer.singleShot(0, lambda: self._create_budgeted(end_index, budget_ms, generation))
+    
+    def _on_thumbnail_destroyed(self, thumbnail_ref: "weakref.ref[OptimizedImageThumbnail]", *_):
+        """destroyed信号处理，Python对象已被回收时各弱引用表会自行清除"""
+        thumbnail = thumbnail_ref()
+        if thumbnail is not None:
+            self._forget_thumbnail(thumbnail)
+    
+    def _forget_thumbnail(self, thumbnail: OptimizedImageThumbnail):
+        """缩略图控件已销毁，清除所有对它的引用"""
+        if self._path_to_thumbnail.get(thumbnail.image_path) is thumbnail:
+            del self._path_to_thumbnail[thumbnail.image_path]
+        self._loaded_lru.pop(thumbnail, None)
+        if thumbnail in self._pending_set:
+            self._pending_set.discard(thumbnail)
+            self.pending_loads.remove(thumbnail)
+        try:
+            self.recycled_thumbnails.remove(thumbnail)
+        except ValueError:
+            pass
+    
+    def _recycle(self, thumbnail: OptimizedImageThumbnail):
+        """回收缩略图容器，回收池已满时销毁"""
+        # 停止尚未完成的加载任务，避免结果写入复用后的容器
+        thumbnail.cleanup()
+        if len(self.recycled_thumbnails) < self.recycled_thumbnails.maxlen:
+            self.recycled_thumbnails.append(thumbnail)
+            thumbnail.hide()
+        else:
+            thumbnail.deleteLater()
+    
+    def _fit_recycle_pool(self, visible_span: int):
+        """按可见缩略图数量调整回收池容量，同一视图模式下只增不减"""
+        if visible_span <= self._max_visible_span:
+            return
+        self._max_visible_span = visible_span
+        
+        capacity = max(self.RECYCLE_POOL_MIN, 2 * visible_span)
+        pool = self.recycled_thumbnails
+        if capacity == pool.maxlen:
+            return
+        # 容量缩小时销毁超出的容器，deque不会替我们释放被挤出的控件
+        while len(pool) > capacity:
+            pool.popleft().deleteLater()
+        self.recycled_thumbnails = deque(pool, maxlen=capacity)
     
     def get_recycled_thumbnail(self, image_path: str, index: int):
         """从回收池获取缩略图容器 - 性能优化"""
@@ -858,23 +1303,52 @@ class OptimizedWaterfallWidget(QWidget):
             thumbnail.index = index
             thumbnail.loaded = False
             thumbnail.loading = False
+            thumbnail.state = ThumbnailState.PLACEHOLDER
             thumbnail.pixmap = None
-            thumbnail.setText("等待加载...<br><br><span style='color: #cccccc; font-size: 12px;font-weight: 400; font-family: 'Microsoft YaHei';'>ℒℴѵℯ时光微醉⁰ɞ</span>")
+            thumbnail._canvas = None
+            thumbnail.image_size = None
+            thumbnail.aspect_ratio = None
+            thumbnail.aspect_pending = False
+            self.layout._cached_item_heights.pop(id(thumbnail), None)
+            thumbnail.set_placeholder(OptimizedImageThumbnail.PLACEHOLDER_HTML)
             thumbnail.setToolTip(os.path.basename(image_path))
+            # 回收时被显式隐藏，重新加入布局前需要恢复显示
+            thumbnail.show()
             return thumbnail
         return None
     
     def create_thumbnail_containers(self, start_index, end_index):
         """创建缩略图容器 - 性能优化版"""
+        missing_paths = []
+        
+        # 性能优化点：批量创建期间暂停重绘和逐项布局，结束后只重新布局一次
+        self.setUpdatesEnabled(False)
+        self.layout.begin_bulk_insert()
+        try:
+            self._add_thumbnail_containers(start_index, end_index, missing_paths)
+        finally:
+            self.layout.end_bulk_insert()
+            self.setUpdatesEnabled(True)
+        
+        self.update_widget_size()
+        
+        # 未命中的图片交给后台线程探测并写回缓存
+        self.start_aspect_probe(missing_paths)
+    
+    def _add_thumbnail_containers(self, start_index, end_index, missing_paths: List[str]):
+        """创建缩略图容器并加入布局，调用方负责批量插入的开始和结束
+
+        尺寸缓存未命中的图片路径追加到missing_paths
+        """
         for i in range(start_index, end_index):
             if i >= len(self.image_files):
                 break
-                
-            image_path = self.image_files[i]
             
+            image_path = self.image_files[i]
+        
             # 性能优化点12：重用缩略图容器
             thumbnail = self.get_recycled_thumbnail(image_path, i)
-            
+        
             if thumbnail is None:
                 thumbnail = OptimizedImageThumbnail(
                     image_path, i, 
@@ -885,22 +1359,64 @@ class OptimizedWaterfallWidget(QWidget):
                 thumbnail.clicked.connect(self.on_thumbnail_clicked)
                 thumbnail.load_completed.connect(self.on_thumbnail_loaded)
                 thumbnail.delete_requested.connect(self.on_image_delete_requested)
-            
+                # 控件被销毁时从查找表和回收池中移除，连接只持有弱引用，不延长缩略图的生命周期
+                thumbnail.destroyed.connect(partial(self._on_thumbnail_destroyed, weakref.ref(thumbnail)))
+        
+            # 从set_images时读取的尺寸条目中取出，校验修改时间
+            entry = self._aspect_entries.pop(image_path, None)
+            size = AspectRatioCache.current_size(image_path, entry) if entry else None
+            if size:
+                thumbnail.aspect_ratio = max(0.4, min(size[1] / size[0], 2.5))
+            elif thumbnail.aspect_ratio is None:
+                thumbnail.aspect_pending = True
+                missing_paths.append(image_path)
+        
             self.thumbnails.append(thumbnail)
+            self._path_to_thumbnail[image_path] = thumbnail
             self.layout.addWidget(thumbnail)
         
         self.loaded_count = min(end_index, len(self.image_files))
-        self.update_widget_size()
+    
+    def start_aspect_probe(self, paths: List[str]):
+        """将图片交给后台线程探测尺寸"""
+        if not paths:
+            return
+        
+        # 所有批次共用一个探测线程
+        if self._aspect_worker is None:
+            self._aspect_worker = AspectRatioProbeWorker(self.aspect_cache)
+            self._aspect_worker.sizes_ready.connect(self.on_aspect_sizes_ready)
+            self._aspect_worker.start()
+        self._aspect_worker.enqueue(paths)
+    
+    def on_aspect_sizes_ready(self, sizes: Dict[str, Tuple[int, int]]):
+        """一批尺寸探测完成，更新比例并重新布局"""
+        updated = False
+        for image_path, size in sizes.items():
+            thumbnail = self._path_to_thumbnail.get(image_path)
+            if thumbnail is None or not thumbnail.aspect_pending:
+                continue
+            
+            thumbnail.aspect_pending = False
+            if thumbnail.aspect_ratio is None:
+                thumbnail.aspect_ratio = max(0.4, min(size[1] / size[0], 2.5))
+            self.layout._cached_item_heights.pop(id(thumbnail), None)
+            updated = True
+        
+        if updated:
+            self.layout.invalidate()
+            self.update_widget_size()
     
     def on_thumbnail_clicked(self, image_path: str, thumbnail_index: int):
         """处理缩略图点击 - 动态计算正确的索引"""
         try:
             # 根据图片路径在当前图片列表中查找正确的索引
-            correct_index = -1
-            for i, file_path in enumerate(self.image_files):
-                if file_path == image_path:
-                    correct_index = i
-                    break
+            correct_index = self.index_of_image(image_path)
+            
+            # 点击视为访问，避免常看的缩略图被优先淘汰
+            thumbnail = self._path_to_thumbnail.get(image_path)
+            if thumbnail is not None:
+                self._touch_loaded([thumbnail])
             
             if correct_index >= 0:
                 # 发射正确的索引
@@ -911,34 +1427,44 @@ class OptimizedWaterfallWidget(QWidget):
         except Exception as e:
             logging.error(f"处理缩略图点击失败: {e}")
     
+    def index_of_image(self, image_path: str) -> int:
+        """按路径查找图片在列表中的索引，找不到返回-1"""
+        if self._index_dirty:
+            self._rebuild_index_map()
+        
+        index = self._path_to_index.get(image_path, -1)
+        # 图片列表在外部被修改后索引会失效，校验不通过时重建一次
+        if index < 0 or index >= len(self.image_files) or self.image_files[index] != image_path:
+            self._rebuild_index_map()
+            index = self._path_to_index.get(image_path, -1)
+        return index
+    
+    def _rebuild_index_map(self):
+        """一次性重建路径到索引的映射"""
+        self._path_to_index = {path: i for i, path in enumerate(self.image_files)}
+        self._index_dirty = False
+    
     def on_image_delete_requested(self, image_path: str):
         """处理图片删除请求"""
         try:
             # 从缩略图列表中移除
-            removed_index = -1
-            for i, thumbnail in enumerate(self.thumbnails):
-                if thumbnail.image_path == image_path:
-                    # 移除缩略图
-                    self.thumbnails.pop(i)
-                    self.layout.removeWidget(thumbnail)
-                    
-                    # 性能优化点13：回收缩略图容器而不是销毁
-                    if len(self.recycled_thumbnails) < 50:  # 限制回收池大小
-                        self.recycled_thumbnails.append(thumbnail)
-                        thumbnail.hide()
-                    else:
-                        thumbnail.deleteLater()
-                        
-                    removed_index = i
-                    break
+            thumbnail = self._path_to_thumbnail.pop(image_path, None)
+            self._path_to_index.pop(image_path, None)
+            self._cache_path_cache.pop(image_path, None)
+            self._index_dirty = True
+            self._last_load_range = (0, 0)  # 索引已变化，下次懒加载检查整个范围
+            if thumbnail is not None:
+                # 移除缩略图
+                self.thumbnails.remove(thumbnail)
+                self._loaded_lru.pop(thumbnail, None)
+                self.layout.removeWidget(thumbnail)
+                
+                # 性能优化点13：回收缩略图容器而不是销毁
+                self._recycle(thumbnail)
             
             # 发射删除信号给主窗口
             self.image_deleted.emit(image_path)
             
-            # 如果找到并移除了缩略图，需要更新后续缩略图的索引
-            if removed_index >= 0:
-                self.update_thumbnail_indices(removed_index)
-            
             # 更新布局
             self.update_widget_size()
             
@@ -949,58 +1475,40 @@ class OptimizedWaterfallWidget(QWidget):
         """根据路径移除缩略图 - 用于主窗口删除回调"""
         try:
             # 从缩略图列表中移除对应的缩略图
-            removed_index = -1
-            for i, thumbnail in enumerate(self.thumbnails):
-                if thumbnail.image_path == image_path:
-                    # 移除缩略图
-                    self.thumbnails.pop(i)
-                    self.layout.removeWidget(thumbnail)
-                    
-                    # 性能优化点13：回收缩略图容器而不是销毁
-                    if len(self.recycled_thumbnails) < 50:  # 限制回收池大小
-                        self.recycled_thumbnails.append(thumbnail)
-                        thumbnail.hide()
-                    else:
-                        thumbnail.deleteLater()
-                        
-                    removed_index = i
-                    break
+            thumbnail = self._path_to_thumbnail.pop(image_path, None)
+            self._path_to_index.pop(image_path, None)
+            self._cache_path_cache.pop(image_path, None)
+            self._index_dirty = True
+            self._last_load_range = (0, 0)  # 索引已变化，下次懒加载检查整个范围
+            if thumbnail is not None:
+                # 移除缩略图
+                self.thumbnails.remove(thumbnail)
+                self._loaded_lru.pop(thumbnail, None)
+                self.layout.removeWidget(thumbnail)
+                
+                # 性能优化点13：回收缩略图容器而不是销毁
+                self._recycle(thumbnail)
             
-            # 如果找到并移除了缩略图，需要更新后续缩略图的索引
-            if removed_index >= 0:
-                self.update_thumbnail_indices(removed_index)
+            # 缩略图的index只用于显示，点击时按路径解析索引，删除后无需逐个重新编号
+            if thumbnail is not None:
                 # 更新布局
                 self.update_widget_size()
                     
         except Exception as e:
             logging.error(f"根据路径移除缩略图失败: {e}")
     
-    def update_thumbnail_indices(self, removed_index: int):
-        """更新缩略图索引 - 删除后重新分配索引"""
-        try:
-            # 更新被删除索引之后的所有缩略图的索引
-            for i in range(removed_index, len(self.thumbnails)):
-                thumbnail = self.thumbnails[i]
-                thumbnail.index = i  # 重新分配索引
-                
-                # 重新连接信号，使用动态索引计算
-                try:
-                    thumbnail.clicked.disconnect()
-                except:
-                    pass
-                thumbnail.clicked.connect(self.on_thumbnail_clicked)
-                
-        except Exception as e:
-            logging.error(f"更新缩略图索引失败: {e}")
-    
-    def start_lazy_loading(self):
-        """开始懒加载 - 性能优化版"""
+    def start_lazy_loading(self, full: bool = False):
+        """开始懒加载 - 性能优化版
+        
+        默认只检查相对上一次新进入加载范围的缩略图，full为True时检查整个范围
+        """
         if not self.thumbnails:
             return
         
         # 强制重新计算可见范围
         self.last_visible_range = (0, 0)
         visible_start, visible_end = self.calculate_visible_range()
+        self._touch_loaded(self.thumbnails[visible_start:visible_end])
         
         # 确保顶部图片优先加载
         if visible_start == 0:
@@ -1012,53 +1520,93 @@ class OptimizedWaterfallWidget(QWidget):
             load_start = max(0, visible_start - 10)  # 增加上方预加载数量
             load_end = min(len(self.thumbnails), visible_end + 20)  # 增加下方预加载数量
         
-        for i in range(load_start, load_end):
-            if i < len(self.thumbnails):
-                thumbnail = self.thumbnails[i]
-                
-                needs_loading = False
-                
-                if "等待加载" in thumbnail.text():
-                    needs_loading = True
-                elif not thumbnail.loaded and not thumbnail.loading:
-                    needs_loading = True
-                elif hasattr(thumbnail, 'was_cleaned') and thumbnail.was_cleaned and not thumbnail.loading:
-                    needs_loading = True
-                
-                if needs_loading:
-                    config = thumbnail.config_manager.get_config()
-                    thumbnail_size = config.get('thumbnail_size', 200)
-                    cache_path = thumbnail.image_processor._get_cache_path(thumbnail.image_path, thumbnail_size)
-                    
-                    if os.path.exists(cache_path):
-                        # 缓存存在，直接加载，不占用worker
-                        thumbnail.start_loading()
-                    else:
-                        # 需要异步加载，检查worker限制
-                        if self.active_workers < self.max_concurrent_workers:
-                            thumbnail.start_loading()
-                            self.active_workers += 1
-                        else:
-                            if thumbnail not in self.pending_loads:
-                                self.pending_loads.append(thumbnail)
+        # 与上一次范围重叠的部分已加载或已排队，只处理差集
+        prev_start, prev_end = self._last_load_range
+        self._last_load_range = (load_start, load_end)
+        if full or prev_end <= load_start or load_end <= prev_start:
+            candidates = self.thumbnails[load_start:load_end]
+        else:
+            candidates = (self.thumbnails[load_start:min(prev_start, load_end)] +
+                          self.thumbnails[max(prev_end, load_start):load_end])
+        
+        # GUI线程只挑选需要加载的缩略图，缓存路径计算和存在性判断交给线程池
+        image_paths = [
+            thumbnail.image_path for thumbnail in candidates
+            if self._needs_loading(thumbnail)
+        ]
+        if not image_paths:
+            return
+        
+        config = self.layout.config_snapshot()
+        key = (config.get('thumbnail_size', 200), get_shadow_params(config))
+        known_paths = {}
+        for image_path in image_paths:
+            cache_path = self._cache_path_cache.get(image_path, {}).get(key)
+            if cache_path is not None:
+                known_paths[image_path] = cache_path
+        _ScanVisibleTask.thread_pool().start(_ScanVisibleTask(
+            image_paths, key[0], key[1],
+            self.image_processor,
+            known_paths,
+            self._scan_signals
+        ))
+    
+    def _cache_path_for(self, image_path: str, size: int,
+                        shadow: Optional[Tuple[int, str]] = None) -> str:
+        """获取缩略图缓存路径，按图片路径记忆计算结果，只在GUI线程中调用"""
+        paths = self._cache_path_cache.get(image_path)
+        if paths is None:
+            paths = self._cache_path_cache.setdefault(image_path, {})
+        
+        cache_path = paths.get((size, shadow))
+        if cache_path is None:
+            cache_path = self.image_processor._get_cache_path(image_path, size, shadow)
+            paths[(size, shadow)] = cache_path
+        return cache_path
+    
+    def _needs_loading(self, thumbnail: OptimizedImageThumbnail) -> bool:
+        """判断缩略图是否需要加载"""
+        return thumbnail.state in (ThumbnailState.PLACEHOLDER, ThumbnailState.CLEANED)
+    
+    def _apply_lazy_loading_decisions(self, key: tuple, decisions: List[Tuple[str, str, bool]]):
+        """在GUI线程中根据扫描结果启动加载"""
+        if self._resources_released:
+            # 清理前已排队的扫描结果，不再启动新的加载
+            return
+        config = self.layout.config_snapshot()
+        if key != (config.get('thumbnail_size', 200), get_shadow_params(config)):
+            # 扫描期间缩略图设置已改变，按新设置重新扫描
+            self.start_lazy_loading(full=True)
+            return
+        load_start, load_end = self._last_load_range
+        for image_path, cache_path, has_cache in decisions:
+            # 扫描任务新算出的缓存路径在这里写入记忆表
+            self._cache_path_cache.setdefault(image_path, {})[key] = cache_path
+            thumbnail = self._path_to_thumbnail.get(image_path)
+            if thumbnail is None or not self._needs_loading(thumbnail):
+                continue
+            
+            # 扫描期间已滚出加载范围的缩略图，重新进入范围时会再次检查
+            if not load_start <= self.index_of_image(image_path) < load_end:
+                continue
+            
+            if has_cache:
+                # 缓存存在，直接加载，不占用worker
+                thumbnail.start_loading(cache_path)
+            elif self.active_workers < self.max_concurrent_workers:
+                # 需要异步加载，检查worker限制
+                thumbnail.start_loading(cache_path)
+                self.active_workers += 1
+            elif thumbnail not in self._pending_set:
+                self.pending_loads.append(thumbnail)
+                self._pending_set.add(thumbnail)
     
     def calculate_visible_range(self):
         """计算可见区域 - 增强版"""
         if not self.thumbnails:
             return 0, 0
         
-        # 查找滚动区域
-        if not hasattr(self, '_cached_scroll_area'):
-            scroll_area = None
-            parent = self.parent()
-            while parent:
-                if hasattr(parent, 'scroll_area'):
-                    scroll_area = parent.scroll_area
-                    break
-                parent = parent.parent()
-            self._cached_scroll_area = scroll_area
-        
-        scroll_area = self._cached_scroll_area
+        scroll_area = self._find_scroll_area()
         if not scroll_area:
             return 0, min(50, len(self.thumbnails))  # 增加默认可见数量
         
@@ -1074,9 +1622,14 @@ class OptimizedWaterfallWidget(QWidget):
         visible_top = scroll_value
         visible_bottom = scroll_value + viewport_height
         
-        # 使用二分查找快速定位可见范围
-        visible_start = self.binary_search_visible_start(visible_top)
-        visible_end = self.binary_search_visible_end(visible_bottom, visible_start)
+        # 使用布局记录的坐标二分查找，无需逐个查询控件几何信息
+        tops = self.layout.get_item_tops()
+        visible_start, visible_end = self._visible_range(
+            tops, self.layout.get_item_bottoms_max(), visible_top, visible_bottom)
+        layout_stale = visible_end >= len(tops)
+        if layout_stale:
+            # 新加入的项目尚未布局，它们位于已布局项目之后，视为可能可见
+            visible_end = len(self.thumbnails)
         
         # 确保范围有效
         visible_start = max(0, visible_start)
@@ -1084,63 +1637,18 @@ class OptimizedWaterfallWidget(QWidget):
         if visible_end <= visible_start:
             visible_end = visible_start + 20  # 增加默认范围
         
+        # 布局未完成时范围被拉伸到末尾，不能代表一屏的数量，不据此调整回收池
+        if not layout_stale:
+            self._fit_recycle_pool(visible_end - visible_start)
         return visible_start, visible_end
     
-    def binary_search_visible_start(self, visible_top):
-        """二分查找可见区域起始索引 - 性能优化"""
-        if not self.thumbnails:
-            return 0
-            
-        # 如果缩略图数量较少，直接线性搜索
-        if len(self.thumbnails) < 50:
-            for i, thumbnail in enumerate(self.thumbnails):
-                if thumbnail.geometry().bottom() >= visible_top:
-                    return i
-            return 0
-        
-        # 二分查找
-        left, right = 0, len(self.thumbnails) - 1
-        while left <= right:
-            mid = (left + right) // 2
-            thumbnail = self.thumbnails[mid]
-            bottom = thumbnail.geometry().bottom()
-            
-            if bottom < visible_top:
-                left = mid + 1
-            else:
-                if mid == 0 or self.thumbnails[mid-1].geometry().bottom() < visible_top:
-                    return mid
-                right = mid - 1
-        
-        return 0
-    
-    def binary_search_visible_end(self, visible_bottom, start_index=0):
-        """二分查找可见区域结束索引 - 性能优化"""
-        if not self.thumbnails:
-            return 0
-            
-        # 如果缩略图数量较少，直接线性搜索
-        if len(self.thumbnails) < 50:
-            for i in range(start_index, len(self.thumbnails)):
-                if self.thumbnails[i].geometry().top() > visible_bottom:
-                    return i
-            return len(self.thumbnails)
-        
-        # 二分查找
-        left, right = start_index, len(self.thumbnails) - 1
-        while left <= right:
-            mid = (left + right) // 2
-            thumbnail = self.thumbnails[mid]
-            top = thumbnail.geometry().top()
-            
-            if top <= visible_bottom:
-                left = mid + 1
-            else:
-                if mid == start_index or self.thumbnails[mid-1].geometry().top() <= visible_bottom:
-                    return mid
-                right = mid - 1
-        
-        return len(self.thumbnails)
+    @staticmethod
+    def _visible_range(tops: List[int], bottoms_max: List[int],
+                       viewport_top: int, viewport_bottom: int) -> Tuple[int, int]:
+        """在单调不减的顶部坐标和底部坐标前缀最大值上二分查找可见范围"""
+        start = bisect_left(bottoms_max, viewport_top)
+        end = bisect_right(tops, viewport_bottom, lo=min(start, len(tops)))
+        return start, end
     
     def process_next_batch(self):
         """处理下一批缩略图容器创建"""
@@ -1157,23 +1665,33 @@ class OptimizedWaterfallWidget(QWidget):
         if self.active_workers > 0:
             self.active_workers -= 1
         
+        # 记录为最近使用
+        thumbnail = self.sender()
+        if isinstance(thumbnail, OptimizedImageThumbnail):
+            self._loaded_lru[thumbnail] = None
+            self._loaded_lru.move_to_end(thumbnail)
+        
         # 发射图片加载完成信号
         self.image_loaded.emit()
         
+        # 配置在循环外读取一次
+        config = self.layout.config_snapshot()
+        thumbnail_size = config.get('thumbnail_size', 200)
+        shadow = get_shadow_params(config)
+        
         while self.pending_loads and self.active_workers < self.max_concurrent_workers:
-            next_thumbnail = self.pending_loads.pop(0)
-            if not next_thumbnail.loaded and not next_thumbnail.loading:
-                config = next_thumbnail.config_manager.get_config()
-                thumbnail_size = config.get('thumbnail_size', 200)
-                cache_path = next_thumbnail.image_processor._get_cache_path(next_thumbnail.image_path, thumbnail_size)
+            next_thumbnail = self.pending_loads.popleft()
+            self._pending_set.discard(next_thumbnail)
+            if self._needs_loading(next_thumbnail):
+                cache_path = self._cache_path_for(next_thumbnail.image_path, thumbnail_size, shadow)
                 
-                if os.path.exists(cache_path):
+                if next_thumbnail.image_processor.has_cached_thumbnail(cache_path):
                     # 缓存存在，直接加载，不占用worker
-                    next_thumbnail.start_loading()
+                    next_thumbnail.start_loading(cache_path)
                     continue
                 else:
                     # 需要异步加载，占用worker
-                    next_thumbnail.start_loading()
+                    next_thumbnail.start_loading(cache_path)
                     self.active_workers += 1
                     break
         
@@ -1182,26 +1700,25 @@ class OptimizedWaterfallWidget(QWidget):
     def clear_thumbnails(self):
         """清除所有缩略图"""
         self.loading_timer.stop()
+        self._create_generation += 1
         
         # 性能优化点16：回收而不是销毁缩略图
         for thumbnail in self.thumbnails:
             thumbnail.cleanup()
             
             # 回收部分缩略图容器
-            if len(self.recycled_thumbnails) < 50:  # 限制回收池大小
-                self.recycled_thumbnails.append(thumbnail)
-                thumbnail.hide()
-            else:
-                thumbnail.deleteLater()
+            self._recycle(thumbnail)
         
         self.thumbnails.clear()
+        self._path_to_thumbnail.clear()
+        self._loaded_lru.clear()
+        self._last_load_range = (0, 0)
         self.pending_loads.clear()
+        self._pending_set.clear()
         self.active_workers = 0
         
-        while self.layout.count():
-            item = self.layout.takeAt(0)
-            if item and item.widget() and item.widget() not in self.recycled_thumbnails:
-                item.widget().deleteLater()
+        # 上面的循环已回收或销毁所有控件，这里只需清空布局项目
+        self.layout.clear_items()
     
     def load_more(self):
         """加载更多"""
@@ -1220,21 +1737,7 @@ class OptimizedWaterfallWidget(QWidget):
     def on_scroll_changed(self):
         """滚动处理 - 增强版"""
         # 检查是否滚动到顶部
-        scroll_area = self._cached_scroll_area if hasattr(self, '_cached_scroll_area') else None
-        if not scroll_area:
-            # 如果没有缓存的滚动区域，尝试查找并缓存
-            parent = self.parent()
-            while parent:
-                if isinstance(parent, QScrollArea):
-                    self._cached_scroll_area = parent
-                    scroll_area = parent
-                    break
-                elif hasattr(parent, 'scroll_area') and parent.scroll_area:
-                    self._cached_scroll_area = parent.scroll_area
-                    scroll_area = parent.scroll_area
-                    break
-                parent = parent.parent()
-        
+        scroll_area = self._find_scroll_area()
         if scroll_area and scroll_area.verticalScrollBar().value() <= 5:
             # 如果滚动到顶部，立即重置可见范围并开始加载
             self.last_visible_range = (0, 0)
@@ -1259,16 +1762,21 @@ class OptimizedWaterfallWidget(QWidget):
             # 开始加载可见区域的图片
             self.start_lazy_loading()
     
+    def _touch_loaded(self, thumbnails):
+        """显示或点击过的已加载缩略图移到LRU的最近使用端"""
+        lru = self._loaded_lru
+        for thumbnail in thumbnails:
+            if thumbnail in lru:
+                lru.move_to_end(thumbnail)
+    
     def cleanup_invisible_images(self):
         """清理不可见图片 - 性能优化版"""
         if not self.thumbnails:
             return
         
-        loaded_count = sum(1 for t in self.thumbnails if t.loaded and hasattr(t, 'pixmap') and t.pixmap)
-        
         memory_pressure_threshold = 2000
         
-        if loaded_count < memory_pressure_threshold:
+        if len(self._loaded_lru) <= memory_pressure_threshold:
             return
         
         visible_start, visible_end = self.calculate_visible_range()
@@ -1277,18 +1785,25 @@ class OptimizedWaterfallWidget(QWidget):
         protect_start = max(0, visible_start - protection_zone)
         protect_end = min(len(self.thumbnails), visible_end + protection_zone)
         
-        cleaned_count = 0
-        
-        for i, thumbnail in enumerate(self.thumbnails):
-            if i < protect_start or i >= protect_end:
-                if thumbnail.loaded and hasattr(thumbnail, 'pixmap') and thumbnail.pixmap:
-                    thumbnail.pixmap = None
-                    thumbnail.loaded = False
-                    thumbnail.was_cleaned = True
-                    thumbnail.setText("等待加载...<br><br><span style='color: #cccccc; font-size: 12px;font-weight: 400; font-family: 'Microsoft YaHei';'>ℒℴѵℯ时光微醉⁰ɞ</span>")
-                    cleaned_count += 1
-                    if cleaned_count >= 100:
-                        break
+        # 从最久未使用的一端开始淘汰，直到降回阈值；保护区内的缩略图移到末尾视为最近使用
+        for _ in range(len(self._loaded_lru)):
+            if len(self._loaded_lru) <= memory_pressure_threshold:
+                break
+            thumbnail, _ = self._loaded_lru.popitem(last=False)
+            if not (thumbnail.loaded and thumbnail.pixmap):
+                continue
+            
+            index = self.index_of_image(thumbnail.image_path)
+            if protect_start <= index < protect_end:
+                self._loaded_lru[thumbnail] = None
+                continue
+            
+            thumbnail.pixmap = None
+            thumbnail._canvas = None
+            thumbnail.loaded = False
+            thumbnail.was_cleaned = True
+            thumbnail.state = ThumbnailState.CLEANED
+            thumbnail.set_placeholder(OptimizedImageThumbnail.PLACEHOLDER_HTML)
     
     def update_widget_size(self):
         """更新组件大小"""
@@ -1296,176 +1811,49 @@ class OptimizedWaterfallWidget(QWidget):
             height = self.layout.heightForWidth(self.width())
             self.setMinimumHeight(height)
     
-    def _reset_scroll_position(self):
-        """重置滚动位置到顶部 - 增强版"""
-        # 强制更新布局，确保所有项目都已正确布局
-        if hasattr(self, 'layout') and hasattr(self.layout, 'invalidate'):
-            self.layout.invalidate()
-            self.layout._layout_dirty = True
-            self.update_widget_size()
-            QApplication.processEvents()
-        
-        # 直接使用缓存的滚动区域（如果有）
-        if hasattr(self, '_cached_scroll_area') and self._cached_scroll_area:
-            self._cached_scroll_area.verticalScrollBar().setValue(0)
-            QApplication.processEvents()
-        
-        # 立即尝试一次滚动重置
-        self._immediate_scroll_to_top()
-        
-        # 使用多次延迟执行滚动重置，确保布局已完全更新
-        QTimer.singleShot(50, lambda: self._delayed_scroll_to_top())
-        QTimer.singleShot(150, lambda: self._delayed_scroll_to_top())
-        QTimer.singleShot(300, lambda: self._delayed_scroll_to_top())
-        
-        return True
+    def _find_scroll_area(self):
+        """查找包含本控件的滚动区域，找到后缓存"""
+        if self._cached_scroll_area is not None:
+            return self._cached_scroll_area
         
-    def _immediate_scroll_to_top(self):
-        """立即尝试滚动到顶部"""
-        # 首先检查是否有缓存的滚动区域
-        if hasattr(self, '_cached_scroll_area') and self._cached_scroll_area:
-            self._cached_scroll_area.verticalScrollBar().setValue(0)
-            QApplication.processEvents()
-            return
-        
-        # 如果没有缓存，则查找并缓存
         parent = self.parent()
         while parent:
-            # 检查是否是QScrollArea
             if isinstance(parent, QScrollArea):
-                parent.verticalScrollBar().setValue(0)
-                self._cached_scroll_area = parent
-                break
-            
-            # 检查是否有verticalScrollBar方法
-            if hasattr(parent, 'verticalScrollBar'):
-                parent.verticalScrollBar().setValue(0)
                 self._cached_scroll_area = parent
                 break
-            
-            # 检查是否有滚动区域属性
-            if hasattr(parent, 'scroll_area'):
-                parent.scroll_area.verticalScrollBar().setValue(0)
+            if getattr(parent, 'scroll_area', None):
                 self._cached_scroll_area = parent.scroll_area
                 break
-            
-            # 向上查找父级
             parent = parent.parent()
         
-        # 强制处理事件，确保滚动生效
-        QApplication.processEvents()
-        
-    def _force_scroll_to_top(self):
-        """强制滚动到顶部的辅助方法 - 增强版"""
-        # 重置可见范围计算
-        self.last_visible_range = (0, 0)
-        
-        # 强制重新计算布局
-        if hasattr(self, 'layout'):
-            self.layout.invalidate()
-            self.layout._layout_dirty = True
-        
-        # 直接使用缓存的滚动区域（如果有）
-        if hasattr(self, '_cached_scroll_area') and self._cached_scroll_area:
-            self._cached_scroll_area.verticalScrollBar().setValue(0)
-            QApplication.processEvents()
-        
-        # 重置滚动位置
-        result = self._reset_scroll_position()
-        
-        # 强制重新加载可见区域的图片
-        QTimer.singleShot(100, lambda: self.start_lazy_loading())
-        
-        # 再次尝试滚动到顶部，确保滚动生效
-        QTimer.singleShot(200, self._immediate_scroll_to_top)
-        
-        return result
+        return self._cached_scroll_area
     
-    def _delayed_scroll_to_top(self):
-        """延迟执行滚动到顶部，确保布局已完全更新"""
-        # 强制再次更新布局
-        if hasattr(self, 'layout') and hasattr(self.layout, 'invalidate'):
-            self.layout.invalidate()
-            self.layout._layout_dirty = True
-            self.update_widget_size()
-            QApplication.processEvents()
+    def _scroll_to_top(self, defer: bool = False):
+        """滚动到顶部并重新加载可见区域
         
-        # 首先检查是否有缓存的滚动区域
-        if hasattr(self, '_cached_scroll_area') and self._cached_scroll_area:
-            self._cached_scroll_area.verticalScrollBar().setValue(0)
-            QApplication.processEvents()
+        defer为True时推迟到当前事件处理完成、布局更新之后再执行
+        """
+        if defer:
+            QTimer.singleShot(0, self._scroll_to_top)
             return True
         
-        parent = self.parent()
-        scroll_reset = False
+        # 重置可见范围计算
+        self.last_visible_range = (0, 0)
         
-        # 1. 直接检查父级
-        while parent and not scroll_reset:
-            # 检查是否是QScrollArea
-            if isinstance(parent, QScrollArea):
-                parent.verticalScrollBar().setValue(0)
-                self._cached_scroll_area = parent
-                scroll_reset = True
-                break
-            
-            # 检查是否有verticalScrollBar方法
-            if hasattr(parent, 'verticalScrollBar'):
-                parent.verticalScrollBar().setValue(0)
-                self._cached_scroll_area = parent
-                scroll_reset = True
-                break
-            
-            # 检查是否有滚动区域属性
-            if hasattr(parent, 'scroll_area'):
-                parent.scroll_area.verticalScrollBar().setValue(0)
-                self._cached_scroll_area = parent.scroll_area
-                scroll_reset = True
-                break
-            
-            # 向上查找父级
-            parent = parent.parent()
+        # 重新计算布局，只分发本控件的布局请求，不重入整个事件循环
+        self.layout.invalidate()
+        self.update_widget_size()
+        QCoreApplication.sendPostedEvents(self, QEvent.LayoutRequest)
         
-        # 2. 如果还没找到，在主窗口中查找QScrollArea
-        if not scroll_reset:
-            main_window = None
-            parent = self.parent()
-            while parent and not main_window:
-                if parent.objectName() == "MainWindow" or hasattr(parent, 'content_stack'):
-                    main_window = parent
-                parent = parent.parent()
-            
-            if main_window:
-                for widget in main_window.findChildren(QScrollArea):
-                    if widget.widget() == self:
-                        widget.verticalScrollBar().setValue(0)
-                        self._cached_scroll_area = widget
-                        scroll_reset = True
-                        break
-        
-        # 3. 最后的尝试：强制更新布局
-        if not scroll_reset:
-            # 强制重新计算布局
-            if hasattr(self, 'layout') and hasattr(self.layout, 'invalidate'):
-                self.layout.invalidate()
-                self.layout._layout_dirty = True
-            
-            # 强制更新大小
-            self.update_widget_size()
-            
-            # 强制处理事件
-            QApplication.processEvents()
-            
-            # 再次尝试滚动到顶部
-            parent = self.parent()
-            while parent and not scroll_reset:
-                if isinstance(parent, QScrollArea):
-                    parent.verticalScrollBar().setValue(0)
-                    self._cached_scroll_area = parent
-                    scroll_reset = True
-                    break
-                parent = parent.parent()
+        scroll_area = self._find_scroll_area()
+        if scroll_area is None:
+            return False
         
-        return scroll_reset
+        scroll_area.verticalScrollBar().setValue(0)
+        
+        # 重新加载可见区域的图片
+        self.start_lazy_loading(full=True)
+        return True
     
     def set_view_mode(self, mode: str):
         """设置视图模式"""
@@ -1473,6 +1861,8 @@ class OptimizedWaterfallWidget(QWidget):
             return  # 如果模式没有变化，不做任何操作
             
         self.current_view_mode = mode
+        # 不同视图模式下一屏容纳的缩略图数量不同，回收池容量重新测量
+        self._max_visible_span = 0
         if hasattr(self.layout, 'view_mode'):
             self.layout.view_mode = mode
             # 强制重新计算布局
@@ -1486,13 +1876,16 @@ class OptimizedWaterfallWidget(QWidget):
         self.update()
         self.update_widget_size()
         
-        # 强制更新所有缩略图
-        for thumbnail in self.thumbnails:
-            if hasattr(thumbnail, 'apply_appearance_settings'):
+        # 缩略图样式与视图模式无关，只有外观配置变化时才需要逐个重新应用，
+        # 其余情况布局重排后各缩略图在resizeEvent中自行更新显示
+        style = build_thumbnail_style(self.layout.config_snapshot())
+        if style != self._applied_style:
+            self._applied_style = style
+            for thumbnail in self.thumbnails:
                 thumbnail.apply_appearance_settings()
         
         # 确保滚动区域可见
-        QTimer.singleShot(100, lambda: self._force_scroll_to_top())
+        self._scroll_to_top(defer=True)
     
     def keyPressEvent(self, event):
         """键盘事件 - 处理DELETE键"""
@@ -1511,8 +1904,19 @@ class OptimizedWaterfallWidget(QWidget):
                 config = self.config_manager.get_config()
             
             # 应用设置到所有现有的缩略图
+            self._applied_style = build_thumbnail_style(config)
             for thumbnail in self.thumbnails:
                 thumbnail.apply_appearance_settings()
+            
+            # 阴影参数变化后，已加载的缩略图需要重新加载带新阴影的缓存
+            shadow = get_shadow_params(config)
+            if shadow != self._applied_shadow:
+                self._applied_shadow = shadow
+                for thumbnail in self.thumbnails:
+                    if thumbnail.loaded and thumbnail.pixmap:
+                        thumbnail.was_cleaned = True
+                        thumbnail.state = ThumbnailState.CLEANED
+                self.start_lazy_loading(full=True)
                 
         except Exception as e:
             logging.error(f"应用外观设置到瀑布流组件失败: {e}")
@@ -1538,11 +1942,27 @@ class OptimizedWaterfallWidget(QWidget):
                     thumbnail.worker.stop()
                     thumbnail.worker = None
             
+            # 丢弃尚未开始的任务，并等待正在运行的任务结束，避免清理后仍有结果发出
+            self._resources_released = True
+            for pool in (_ScanVisibleTask.thread_pool(), OptimizedThumbnailWorker.thread_pool()):
+                pool.clear()
+                if not pool.waitForDone(self.POOL_WAIT_TIMEOUT_MS):
+                    logging.warning("等待线程池任务结束超时")
+            
+            # 等待尺寸探测线程结束
+            if self._aspect_worker is not None:
+                self._aspect_worker.stop()
+                self._aspect_worker.wait()
+                self._aspect_worker = None
+            self._aspect_entries.clear()
+            
             # 清理回收的缩略图
             self.recycled_thumbnails.clear()
+            self._loaded_lru.clear()
             
             # 清理缓存
             self.image_size_cache.clear()
+            self._cache_path_cache.clear()
             
             # 强制垃圾回收
             import gc
@@ -4,12 +4,159 @@
 设置对话框
 """
 
+import os
+import shutil
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 
+@lru_cache(maxsize=64)
+def _qcolor(hex_color):
+    """解析颜色字符串，结果缓存复用"""
+    return QColor(hex_color)
+
+@lru_cache(maxsize=64)
+def _color_button_css(object_name, hex_color):
+    """单个颜色按钮的样式规则"""
+    return f"QPushButton#{object_name} {{ background-color: {hex_color}; border: 1px solid #ccc; }}"
+
+def _scan_dir(path):
+    """统计目录下文件的大小，返回 (文件总大小, 子目录列表, 目录修改时间)"""
+    total_size = 0
+    subdirs = []
+    # 性能优化点：用os.scandir遍历，直接读取目录项的stat结果，每个文件只stat一次
+    mtime = os.stat(path).st_mtime_ns
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                else:
+                    total_size += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    return total_size, subdirs, mtime
+
+def _walk_cache_dir(root):
+    """深度优先遍历目录树，返回 (总大小, [(目录, 修改时间)])"""
+    total_size = 0
+    dir_mtimes = []
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        try:
+            size, subdirs, mtime = _scan_dir(path)
+        except OSError:
+            continue
+        total_size += size
+        dir_mtimes.append((path, mtime))
+        stack.extend(subdirs)
+    return total_size, dir_mtimes
+
+class _CacheSizeSignals(QObject):
+    """缓存大小计算任务的信号，QRunnable本身不能发射信号"""
+    
+    finished = pyqtSignal('qint64')  # 缓存总大小（字节），超过2GB需要64位整数
+
+class _CacheSizeWorker(QRunnable):
+    """在线程池中遍历缓存目录，避免阻塞界面"""
+    
+    def __init__(self, measure, signals: _CacheSizeSignals):
+        super().__init__()
+        self.measure = measure  # 计算缓存大小的函数
+        self.signals = signals
+    
+    def run(self):
+        """运行任务"""
+        try:
+            self.signals.finished.emit(self.measure())
+        except RuntimeError:
+            # 对话框已销毁
+            pass
+        except Exception as e:
+            logging.error(f"计算缓存大小失败: {e}")
+
+class _ClearCacheSignals(QObject):
+    """清除缓存任务的信号"""
+    
+    finished = pyqtSignal(bool, str)  # 是否成功, 错误信息
+
+class _ClearCacheWorker(QRunnable):
+    """在线程池中删除并重建缓存目录"""
+    
+    def __init__(self, cache_dir, signals: _ClearCacheSignals):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.signals = signals
+    
+    def run(self):
+        """运行任务"""
+        try:
+            shutil.rmtree(self.cache_dir)
+            os.makedirs(self.cache_dir)
+            ok, error = True, ""
+        except Exception as e:
+            logging.error(f"清除缓存失败: {e}")
+            ok, error = False, str(e)
+        
+        try:
+            self.signals.finished.emit(ok, error)
+        except RuntimeError:
+            # 对话框已销毁
+            pass
+
 class SettingsDialog(QDialog):
-    """设置对话框"""
+    """设置对话框
+    
+    对话框可以重复使用：每次显示前调用load_settings()，
+    会从配置管理器重新读取配置并刷新所有已创建的选项卡
+    """
+    
+    # 选项卡索引
+    BASIC_TAB = 0
+    APPEARANCE_TAB = 1
+    PERFORMANCE_TAB = 2
+    
+    # 数值和开关类设置项 {配置键: (控件类型, 所属选项卡, 标签, 取值范围, 后缀, 默认值)}
+    _FIELD_SPECS = {
+        'initial_load_count': (QSpinBox, BASIC_TAB, "首屏加载图片数量:", (10, 500), " 张", 100),
+        'thumbnail_size': (QSpinBox, BASIC_TAB, "缩略图大小:", (100, 500), " px", 200),
+        'preview_scale': (QSpinBox, BASIC_TAB, "预览图缩放比例:", (50, 100), " %", 80),
+        'preview_window_scale': (QSpinBox, BASIC_TAB, "预览窗口大小比例:", (50, 100), " %", 80),
+        'image_border': (QCheckBox, APPEARANCE_TAB, "启用边框", None, None, True),
+        'border_width': (QSpinBox, APPEARANCE_TAB, "边框宽度:", (1, 10), " px", 2),
+        'waterfall_columns': (QSpinBox, APPEARANCE_TAB, "瀑布流列数:", (2, 8), None, 4),
+        'grid_columns': (QSpinBox, APPEARANCE_TAB, "网格列数:", (3, 12), None, 6),
+        'image_shadow': (QCheckBox, APPEARANCE_TAB, "启用阴影", None, None, True),
+        'shadow_size': (QSpinBox, APPEARANCE_TAB, "阴影大小:", (1, 20), " px", 5),
+        'image_rounded': (QCheckBox, APPEARANCE_TAB, "启用圆角", None, None, True),
+        'rounded_size': (QSpinBox, APPEARANCE_TAB, "圆角大小:", (1, 50), " px", 8),
+        'hover_enabled': (QCheckBox, APPEARANCE_TAB, "启用悬停效果", None, None, True),
+        'cache_size': (QSpinBox, PERFORMANCE_TAB, "缓存大小:", (100, 5000), " 张", 3000),
+    }
+    
+    # 配置项缺失时对话框显示的默认值
+    _DEFAULTS = {
+        **{key: spec[-1] for key, spec in _FIELD_SPECS.items()},
+        'border_color': '#E0E0E0',
+        'shadow_color': '#808080',
+        'hover_color': '#e3f2fd',
+        'hover_border_color': '#2196f3',
+    }
+    
+    # 缓存按钮的节流时间窗口（毫秒）
+    CACHE_ACTION_THROTTLE_MS = 500
+    
+    # 文件大小单位
+    SIZE_UNITS = ("B", "KB", "MB", "GB")
+    
+    # 缓存大小计算结果 {缓存目录绝对路径: (((目录, 修改时间), ...), 总大小)}
+    _cache_size_cache = {}
     
     def __init__(self, config_manager, parent=None):
         super().__init__(parent)
@@ -25,25 +172,51 @@ class SettingsDialog(QDialog):
         self.setFixedSize(500, 600)
         self.setModal(True)
         
+        # 节流计时器：计时期间再次点击缓存按钮将被忽略
+        self._cache_action_timer = QTimer(self)
+        self._cache_action_timer.setSingleShot(True)
+        self._cache_action_timer.setInterval(self.CACHE_ACTION_THROTTLE_MS)
+        
+        # 当前缓存大小计算任务的信号，旧任务的结果将被忽略
+        self._cache_size_signals = None
+        # 计算完成后是否需要提示用户（检查缓存大小按钮）
+        self._cache_check_pending = False
+        # 提示框打开期间完成的缓存大小检查结果，提示框关闭后再提示
+        self._deferred_cache_report = None
+        
+        # 颜色选择对话框，首次选择颜色时创建
+        self._color_picker = None
+        # 正在执行的清除缓存任务的信号
+        self._clear_cache_signals = None
+        # 确认框和提示框，首次使用时创建
+        self._confirm_box = None
+        self._message_box = None
+        
         # 创建主布局
         layout = QVBoxLayout(self)
         
+        # 已创建的设置项控件 {配置键: 控件}，随选项卡创建而登记
+        self._widgets = {}
+        # 加载设置时需要屏蔽信号的数值控件
+        self._settings_widgets = []
+        
         # 创建选项卡
-        tab_widget = QTabWidget()
+        self.tab_widget = QTabWidget()
         
         # 基本设置选项卡
         basic_tab = self.create_basic_tab()
-        tab_widget.addTab(basic_tab, "基本设置")
-        
-        # 外观设置选项卡
-        appearance_tab = self.create_appearance_tab()
-        tab_widget.addTab(appearance_tab, "外观设置")
+        self.tab_widget.addTab(basic_tab, "基本设置")
         
-        # 性能设置选项卡
-        performance_tab = self.create_performance_tab()
-        tab_widget.addTab(performance_tab, "性能设置")
+        # 性能优化点：外观和性能选项卡先放占位控件，首次切换到时再创建
+        self._tab_builders = {
+            self.APPEARANCE_TAB: (self.create_appearance_tab, self.load_appearance_settings),
+            self.PERFORMANCE_TAB: (self.create_performance_tab, self.load_performance_settings),
+        }
+        self.tab_widget.addTab(QWidget(), "外观设置")
+        self.tab_widget.addTab(QWidget(), "性能设置")
+        self.tab_widget.currentChanged.connect(self._ensure_tab_built)
         
-        layout.addWidget(tab_widget)
+        layout.addWidget(self.tab_widget)
         
         # 创建按钮
         button_layout = QHBoxLayout()
@@ -63,58 +236,99 @@ class SettingsDialog(QDialog):
         
         layout.addLayout(button_layout)
     
+    def _is_tab_built(self, index):
+        """选项卡内容是否已创建"""
+        return index not in self._tab_builders
+    
+    @pyqtSlot(int)
+    def _ensure_tab_built(self, index):
+        """首次切换到选项卡时创建其内容并加载设置"""
+        builders = self._tab_builders.pop(index, None)
+        if builders is None:
+            return
+        
+        create_tab, load_tab_settings = builders
+        title = self.tab_widget.tabText(index)
+        
+        # 替换占位控件期间屏蔽currentChanged，避免重入
+        self.tab_widget.blockSignals(True)
+        try:
+            placeholder = self.tab_widget.widget(index)
+            self.tab_widget.removeTab(index)
+            self.tab_widget.insertTab(index, create_tab(), title)
+            self.tab_widget.setCurrentIndex(index)
+            placeholder.deleteLater()
+        finally:
+            self.tab_widget.blockSignals(False)
+        
+        with self._hold_updates():
+            load_tab_settings()
+    
+    def _add_field(self, key, layout):
+        """按_FIELD_SPECS创建设置项控件并加入布局"""
+        widget_cls, _, label, value_range, suffix, _ = self._FIELD_SPECS[key]
+        
+        if widget_cls is QCheckBox:
+            widget = QCheckBox(label)
+            layout.addWidget(widget)
+        else:
+            widget = widget_cls()
+            widget.setRange(*value_range)
+            if suffix:
+                widget.setSuffix(suffix)
+            layout.addRow(label, widget)
+            # 复选框的toggled信号负责启用/禁用子设置，不能屏蔽，只登记数值控件
+            self._settings_widgets.append(widget)
+        
+        self._widgets[key] = widget
+        return widget
+    
+    @contextmanager
+    def _hold_updates(self):
+        """批量设置控件值：屏蔽数值控件信号并暂停重绘，结束后统一刷新"""
+        # 性能优化点：避免每次setValue都派发信号、触发重绘
+        self.setUpdatesEnabled(False)
+        blocked = [(w, w.blockSignals(True)) for w in self._settings_widgets]
+        try:
+            yield
+        finally:
+            for w, was_blocked in blocked:
+                w.blockSignals(was_blocked)
+            self.setUpdatesEnabled(True)
+    
     def create_basic_tab(self):
         """创建基本设置选项卡"""
         widget = QWidget()
         layout = QFormLayout(widget)
         
-        # 初始加载数量
-        self.load_count_spin = QSpinBox()
-        self.load_count_spin.setRange(10, 500)
-        self.load_count_spin.setSuffix(" 张")
-        layout.addRow("首屏加载图片数量:", self.load_count_spin)
-        
-        # 缩略图大小
-        self.thumbnail_size_spin = QSpinBox()
-        self.thumbnail_size_spin.setRange(100, 500)
-        self.thumbnail_size_spin.setSuffix(" px")
-        layout.addRow("缩略图大小:", self.thumbnail_size_spin)
-        
-        # 预览缩放比例
-        self.preview_scale_spin = QSpinBox()
-        self.preview_scale_spin.setRange(50, 100)
-        self.preview_scale_spin.setSuffix(" %")
-        layout.addRow("预览图缩放比例:", self.preview_scale_spin)
-        
-        # 预览窗口大小比例
-        self.preview_window_scale_spin = QSpinBox()
-        self.preview_window_scale_spin.setRange(50, 100)
-        self.preview_window_scale_spin.setSuffix(" %")
-        layout.addRow("预览窗口大小比例:", self.preview_window_scale_spin)
+        self.load_count_spin = self._add_field('initial_load_count', layout)
+        self.thumbnail_size_spin = self._add_field('thumbnail_size', layout)
+        self.preview_scale_spin = self._add_field('preview_scale', layout)
+        self.preview_window_scale_spin = self._add_field('preview_window_scale', layout)
         
         return widget
     
     def create_appearance_tab(self):
         """创建外观设置选项卡"""
         widget = QWidget()
+        # 颜色按钮共用选项卡上的一份样式表 {按钮对象名: 颜色}
+        self._appearance_tab = widget
+        self._color_hex = {}
         layout = QFormLayout(widget)
         
         # 图片边框
         border_group = QGroupBox("图片边框")
         border_layout = QVBoxLayout(border_group)
         
-        self.border_check = QCheckBox("启用边框")
-        border_layout.addWidget(self.border_check)
+        self.border_check = self._add_field('image_border', border_layout)
         
         border_settings = QWidget()
         border_settings_layout = QFormLayout(border_settings)
         
-        self.border_width_spin = QSpinBox()
-        self.border_width_spin.setRange(1, 10)
-        self.border_width_spin.setSuffix(" px")
-        border_settings_layout.addRow("边框宽度:", self.border_width_spin)
+        self.border_width_spin = self._add_field('border_width', border_settings_layout)
         
         self.border_color_button = QPushButton()
+        self.border_color_button.setObjectName("borderColor")
         self.border_color_button.setFixedHeight(30)
         self.border_color_button.clicked.connect(self.choose_border_color)
         border_settings_layout.addRow("边框颜色:", self.border_color_button)
@@ -131,20 +345,12 @@ class SettingsDialog(QDialog):
         layout_group_layout = QFormLayout(layout_group)
         
         # 瀑布流列数
-        self.waterfall_columns_spin = QSpinBox()
-        self.waterfall_columns_spin.setRange(2, 8)
-        self.waterfall_columns_spin.setValue(4)
+        self.waterfall_columns_spin = self._add_field('waterfall_columns', layout_group_layout)
         self.waterfall_columns_spin.setToolTip("设置瀑布流视图的列数 (2-8列)")
-        layout_group_layout.addRow("瀑布流列数:", self.waterfall_columns_spin)
         
         # 网格列数
-        self.grid_columns_spin = QSpinBox()
-        self.grid_columns_spin.setRange(3, 12)
-        self.grid_columns_spin.setValue(6)
+        self.grid_columns_spin = self._add_field('grid_columns', layout_group_layout)
         self.grid_columns_spin.setToolTip("设置网格视图的列数 (3-12列)")
-        layout_group_layout.addRow("网格列数:", self.grid_columns_spin)
-        
-
         
         layout.addRow(layout_group)
         
@@ -152,18 +358,15 @@ class SettingsDialog(QDialog):
         shadow_group = QGroupBox("图片阴影")
         shadow_layout = QVBoxLayout(shadow_group)
         
-        self.shadow_check = QCheckBox("启用阴影")
-        shadow_layout.addWidget(self.shadow_check)
+        self.shadow_check = self._add_field('image_shadow', shadow_layout)
         
         shadow_settings = QWidget()
         shadow_settings_layout = QFormLayout(shadow_settings)
         
-        self.shadow_size_spin = QSpinBox()
-        self.shadow_size_spin.setRange(1, 20)
-        self.shadow_size_spin.setSuffix(" px")
-        shadow_settings_layout.addRow("阴影大小:", self.shadow_size_spin)
+        self.shadow_size_spin = self._add_field('shadow_size', shadow_settings_layout)
         
         self.shadow_color_button = QPushButton()
+        self.shadow_color_button.setObjectName("shadowColor")
         self.shadow_color_button.setFixedHeight(30)
         self.shadow_color_button.clicked.connect(self.choose_shadow_color)
         shadow_settings_layout.addRow("阴影颜色:", self.shadow_color_button)
@@ -179,16 +382,12 @@ class SettingsDialog(QDialog):
         rounded_group = QGroupBox("圆角设置")
         rounded_layout = QVBoxLayout(rounded_group)
         
-        self.rounded_check = QCheckBox("启用圆角")
-        rounded_layout.addWidget(self.rounded_check)
+        self.rounded_check = self._add_field('image_rounded', rounded_layout)
         
         rounded_settings = QWidget()
         rounded_settings_layout = QFormLayout(rounded_settings)
         
-        self.rounded_size_spin = QSpinBox()
-        self.rounded_size_spin.setRange(1, 50)
-        self.rounded_size_spin.setSuffix(" px")
-        rounded_settings_layout.addRow("圆角大小:", self.rounded_size_spin)
+        self.rounded_size_spin = self._add_field('rounded_size', rounded_settings_layout)
         
         rounded_layout.addWidget(rounded_settings)
         
@@ -201,18 +400,19 @@ class SettingsDialog(QDialog):
         hover_group = QGroupBox("鼠标悬停效果")
         hover_layout = QVBoxLayout(hover_group)
         
-        self.hover_check = QCheckBox("启用悬停效果")
-        hover_layout.addWidget(self.hover_check)
+        self.hover_check = self._add_field('hover_enabled', hover_layout)
         
         hover_settings = QWidget()
         hover_settings_layout = QFormLayout(hover_settings)
         
         self.hover_color_button = QPushButton()
+        self.hover_color_button.setObjectName("hoverColor")
         self.hover_color_button.setFixedHeight(30)
         self.hover_color_button.clicked.connect(self.choose_hover_color)
         hover_settings_layout.addRow("悬停背景色:", self.hover_color_button)
         
         self.hover_border_color_button = QPushButton()
+        self.hover_border_color_button.setObjectName("hoverBorderColor")
         self.hover_border_color_button.setFixedHeight(30)
         self.hover_border_color_button.clicked.connect(self.choose_hover_border_color)
         hover_settings_layout.addRow("悬停边框色:", self.hover_border_color_button)
@@ -232,10 +432,7 @@ class SettingsDialog(QDialog):
         layout = QFormLayout(widget)
         
         # 缓存大小
-        self.cache_size_spin = QSpinBox()
-        self.cache_size_spin.setRange(100, 5000)
-        self.cache_size_spin.setSuffix(" 张")
-        layout.addRow("缓存大小:", self.cache_size_spin)
+        self.cache_size_spin = self._add_field('cache_size', layout)
         
         # 缓存信息显示
         self.cache_info_label = QLabel()
@@ -243,72 +440,124 @@ class SettingsDialog(QDialog):
         layout.addRow("缓存状态:", self.cache_info_label)
         
         # 清除缓存按钮
-        clear_cache_button = QPushButton("清除缓存")
-        clear_cache_button.clicked.connect(self.clear_cache)
-        layout.addRow("", clear_cache_button)
+        self.clear_cache_button = QPushButton("清除缓存")
+        self.clear_cache_button.clicked.connect(self._on_clear_cache_clicked)
+        layout.addRow("", self.clear_cache_button)
         
         # 检查缓存大小按钮
         check_cache_button = QPushButton("检查缓存大小")
-        check_cache_button.clicked.connect(self.check_cache_size)
+        check_cache_button.clicked.connect(self._on_check_cache_clicked)
         layout.addRow("", check_cache_button)
         
         return widget
     
+    def _cache_action_allowed(self):
+        """节流判断：时间窗口内只放行第一次点击"""
+        if self._cache_action_timer.isActive():
+            return False
+        self._cache_action_timer.start()
+        return True
+    
+    @pyqtSlot()
+    def _on_clear_cache_clicked(self):
+        """清除缓存按钮"""
+        # 性能优化点：连续点击合并为一次，避免重复遍历缓存目录
+        if self._cache_action_allowed():
+            self.clear_cache()
+    
+    @pyqtSlot()
+    def _on_check_cache_clicked(self):
+        """检查缓存大小按钮"""
+        if self._cache_action_allowed():
+            self.check_cache_size()
+    
+    def _pick_color(self, key, title, button):
+        """弹出颜色选择对话框，选中后更新配置和按钮"""
+        # 性能优化点：四个颜色按钮共用一个颜色对话框，首次使用时创建
+        if self._color_picker is None:
+            self._color_picker = QColorDialog(self)
+        
+        self._color_picker.setCurrentColor(_qcolor(self.config.get(key, self._DEFAULTS[key])))
+        self._color_picker.setWindowTitle(title)
+        
+        if self._color_picker.exec_() == QDialog.Accepted:
+            color = self._color_picker.selectedColor()
+            if color.isValid():
+                self.config[key] = color.name()
+                self.update_color_button(button, color.name())
+    
+    @pyqtSlot()
     def choose_border_color(self):
         """选择边框颜色"""
-        current_color = QColor(self.config.get('border_color', '#E0E0E0'))
-        color = QColorDialog.getColor(current_color, self, "选择边框颜色")
-        
-        if color.isValid():
-            self.config['border_color'] = color.name()
-            self.update_color_button(self.border_color_button, color)
+        self._pick_color('border_color', "选择边框颜色", self.border_color_button)
     
+    @pyqtSlot()
     def choose_shadow_color(self):
         """选择阴影颜色"""
-        current_color = QColor(self.config.get('shadow_color', '#808080'))
-        color = QColorDialog.getColor(current_color, self, "选择阴影颜色")
-        
-        if color.isValid():
-            self.config['shadow_color'] = color.name()
-            self.update_color_button(self.shadow_color_button, color)
+        self._pick_color('shadow_color', "选择阴影颜色", self.shadow_color_button)
     
+    @pyqtSlot()
     def choose_hover_color(self):
         """选择悬停背景颜色"""
-        current_color = QColor(self.config.get('hover_color', '#e3f2fd'))
-        color = QColorDialog.getColor(current_color, self, "选择悬停背景颜色")
-        
-        if color.isValid():
-            self.config['hover_color'] = color.name()
-            self.update_color_button(self.hover_color_button, color)
+        self._pick_color('hover_color', "选择悬停背景颜色", self.hover_color_button)
     
+    @pyqtSlot()
     def choose_hover_border_color(self):
         """选择悬停边框颜色"""
-        current_color = QColor(self.config.get('hover_border_color', '#2196f3'))
-        color = QColorDialog.getColor(current_color, self, "选择悬停边框颜色")
-        
-        if color.isValid():
-            self.config['hover_border_color'] = color.name()
-            self.update_color_button(self.hover_border_color_button, color)
+        self._pick_color('hover_border_color', "选择悬停边框颜色", self.hover_border_color_button)
     
-    def update_color_button(self, button, color):
+    def update_color_button(self, button, hex_color):
         """更新颜色按钮显示"""
-        button.setStyleSheet(f"background-color: {color.name()}; border: 1px solid #ccc;")
+        self.update_color_buttons({button: hex_color})
+    
+    def update_color_buttons(self, colors):
+        """批量更新颜色按钮显示 {按钮: 颜色}"""
+        changed = False
+        for button, hex_color in colors.items():
+            hex_color = _qcolor(hex_color).name()
+            if self._color_hex.get(button.objectName()) != hex_color:
+                self._color_hex[button.objectName()] = hex_color
+                changed = True
+        
+        # 性能优化点：所有颜色按钮合并为一份样式表，只在颜色变化时重新设置一次
+        if changed:
+            self._appearance_tab.setStyleSheet("\n".join(
+                _color_button_css(name, hex_color) for name, hex_color in self._color_hex.items()
+            ))
     
     def get_cache_size(self):
         """获取缓存大小（字节）"""
-        import os
-        cache_dir = "cache"
-        total_size = 0
-        
-        if os.path.exists(cache_dir):
-            for dirpath, dirnames, filenames in os.walk(cache_dir):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    try:
-                        total_size += os.path.getsize(filepath)
-                    except (OSError, IOError):
-                        continue
+        cache_dir = os.path.abspath("cache")
+        
+        # 各目录的修改时间都未变化时（没有文件增删），直接使用上次的结果
+        cached = self._cache_size_cache.get(cache_dir)
+        if cached is not None:
+            dir_mtimes, size = cached
+            try:
+                if all(os.stat(path).st_mtime_ns == mtime for path, mtime in dir_mtimes):
+                    return size
+            except OSError:
+                pass
+        
+        try:
+            total_size, subdirs, mtime = _scan_dir(cache_dir)
+        except OSError:
+            return 0
+        dir_mtimes = [(cache_dir, mtime)]
+        
+        # 性能优化点：有多个子目录时并行遍历，各线程的stat调用可以同时等待磁盘
+        if len(subdirs) > 1:
+            max_workers = min(8, (os.cpu_count() or 1) * 2, len(subdirs))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_walk_cache_dir, subdirs))
+        else:
+            results = [_walk_cache_dir(path) for path in subdirs]
+        
+        for size, mtimes in results:
+            total_size += size
+            dir_mtimes.extend(mtimes)
         
+        self._cache_size_cache[cache_dir] = (tuple(dir_mtimes), total_size)
         return total_size
     
     def format_size(self, size_bytes):
@@ -316,17 +565,41 @@ class SettingsDialog(QDialog):
         if size_bytes == 0:
             return "0 B"
         
-        size_names = ["B", "KB", "MB", "GB"]
-        i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
-        
-        return f"{size_bytes:.1f} {size_names[i]}"
+        # 性能优化点：由二进制位数直接算出单位，不再循环除以1024
+        i = min((int(size_bytes).bit_length() - 1) // 10, len(self.SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (10 * i)):.1f} {self.SIZE_UNITS[i]}"
     
     def update_cache_info(self):
-        """更新缓存信息显示"""
-        cache_size = self.get_cache_size()
+        """更新缓存信息显示，缓存大小在后台线程中计算"""
+        self.cache_info_label.setText("计算中…")
+        self.cache_info_label.setStyleSheet("")
+        
+        # 性能优化点：目录遍历放到线程池中执行，大缓存也不会卡住对话框
+        self._cache_size_signals = _CacheSizeSignals()
+        self._cache_size_signals.finished.connect(self._on_cache_size_ready)
+        QThreadPool.globalInstance().start(
+            _CacheSizeWorker(self.get_cache_size, self._cache_size_signals)
+        )
+    
+    @pyqtSlot('qint64')
+    def _on_cache_size_ready(self, cache_size):
+        """缓存大小计算完成"""
+        if self.sender() is not self._cache_size_signals:
+            return
+        self._cache_size_signals = None
+        
+        self.show_cache_size(cache_size)
+        
+        if self._cache_check_pending:
+            self._cache_check_pending = False
+            if self._modal_box_visible():
+                # 确认框或提示框仍打开时不能再次exec_，等它关闭后再提示
+                self._deferred_cache_report = cache_size
+            else:
+                self.report_cache_size(cache_size)
+    
+    def show_cache_size(self, cache_size):
+        """显示缓存大小"""
         formatted_size = self.format_size(cache_size)
         
         if cache_size > 2 * 1024 * 1024 * 1024:  # 超过2GB
@@ -337,123 +610,186 @@ class SettingsDialog(QDialog):
             self.cache_info_label.setStyleSheet("color: green;")
     
     def check_cache_size(self):
-        """检查缓存大小并提示删除"""
-        cache_size = self.get_cache_size()
-        formatted_size = self.format_size(cache_size)
-        
-        # 更新显示
+        """检查缓存大小，计算完成后提示用户"""
+        self._cache_check_pending = True
         self.update_cache_info()
+    
+    def report_cache_size(self, cache_size):
+        """根据缓存大小提示删除"""
+        formatted_size = self.format_size(cache_size)
         
         # 如果超过2GB，提示用户删除
         if cache_size > 2 * 1024 * 1024 * 1024:  # 2GB
-            reply = QMessageBox.question(
-                self, "缓存过大", 
+            if self._confirm(
+                "缓存过大",
                 f"当前缓存大小为 {formatted_size}，已超过2GB。\n\n"
                 "删除缓存可以释放磁盘空间，但可能会影响图片加载速度。\n"
-                "是否要删除缓存？",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.No
-            )
-            
-            if reply == QMessageBox.Yes:
+                "是否要删除缓存？"
+            ):
                 self.clear_cache()
-                self.update_cache_info()
         else:
-            QMessageBox.information(
-                self, "缓存检查", 
-                f"当前缓存大小为 {formatted_size}，在正常范围内。"
+            self._show_message("缓存检查", f"当前缓存大小为 {formatted_size}，在正常范围内。")
+    
+    def _modal_box_visible(self):
+        """确认框或提示框是否正在显示"""
+        return any(box is not None and box.isVisible()
+                   for box in (self._confirm_box, self._message_box))
+    
+    def _exec_box(self, box):
+        """模态显示消息框，关闭后补上期间被推迟的缓存大小提示"""
+        result = box.exec_()
+        if self._deferred_cache_report is not None:
+            # 延后到事件循环中执行，让触发本消息框的操作先处理完返回值
+            QTimer.singleShot(0, self._report_deferred_cache_size)
+        return result
+    
+    def _report_deferred_cache_size(self):
+        """提示被推迟的缓存大小检查结果"""
+        if self._deferred_cache_report is None or self._modal_box_visible():
+            return
+        cache_size, self._deferred_cache_report = self._deferred_cache_report, None
+        self.report_cache_size(cache_size)
+    
+    def _confirm(self, title, text):
+        """弹出是/否确认框，返回是否选择了“是”"""
+        # 性能优化点：复用同一个消息框，不再每次构造新的对话框
+        if self._confirm_box is None:
+            self._confirm_box = QMessageBox(
+                QMessageBox.Question, "", "", QMessageBox.Yes | QMessageBox.No, self
             )
+            self._confirm_box.setDefaultButton(QMessageBox.No)
+        
+        self._confirm_box.setWindowTitle(title)
+        self._confirm_box.setText(text)
+        return self._exec_box(self._confirm_box) == QMessageBox.Yes
+    
+    def _show_message(self, title, text, icon=QMessageBox.Information):
+        """弹出提示框"""
+        if self._message_box is None:
+            self._message_box = QMessageBox(self)
+        
+        self._message_box.setIcon(icon)
+        self._message_box.setWindowTitle(title)
+        self._message_box.setText(text)
+        self._exec_box(self._message_box)
     
     def clear_cache(self):
         """清除缓存"""
-        reply = QMessageBox.question(
-            self, "确认", "确定要清除所有缓存吗？\n\n删除后可能影响图片加载速度。",
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.No
-        )
-        
-        if reply == QMessageBox.Yes:
-            import shutil
-            import os
+        if self._confirm("确认", "确定要清除所有缓存吗？\n\n删除后可能影响图片加载速度。"):
             cache_dir = "cache"
             if os.path.exists(cache_dir):
-                try:
-                    shutil.rmtree(cache_dir)
-                    os.makedirs(cache_dir)
-                    QMessageBox.information(self, "完成", "缓存已清除")
-                except Exception as e:
-                    QMessageBox.warning(self, "错误", f"清除缓存失败: {str(e)}")
+                # 性能优化点：删除大量缓存文件放到线程池中执行，界面保持响应
+                self.clear_cache_button.setEnabled(False)
+                self.cache_info_label.setText("清除中…")
+                self.cache_info_label.setStyleSheet("")
+                # 忽略清除前发起的缓存大小计算结果，对应的检查提示也一并取消
+                self._cache_size_signals = None
+                self._cache_check_pending = False
+                self._deferred_cache_report = None
+                
+                self._clear_cache_signals = _ClearCacheSignals()
+                self._clear_cache_signals.finished.connect(self._on_cache_cleared)
+                QThreadPool.globalInstance().start(
+                    _ClearCacheWorker(cache_dir, self._clear_cache_signals)
+                )
             else:
-                QMessageBox.information(self, "完成", "缓存目录不存在，无需清除")
+                self._show_message("完成", "缓存目录不存在，无需清除")
+    
+    @pyqtSlot(bool, str)
+    def _on_cache_cleared(self, ok, error):
+        """清除缓存完成"""
+        if self.sender() is not self._clear_cache_signals:
+            return
+        self._clear_cache_signals = None
+        
+        self.clear_cache_button.setEnabled(True)
+        self._cache_size_cache.clear()
+        
+        if ok:
+            # 同步图片处理器记录的缓存文件
+            image_processor = getattr(self.parent(), 'image_processor', None)
+            if image_processor is not None:
+                image_processor.clear_cache()
+            
+            # 缓存目录刚被清空，大小必然为0，无需再遍历
+            self.show_cache_size(0)
+            self._show_message("完成", "缓存已清除")
+        else:
+            # 可能只删除了部分文件，重新计算
+            self.update_cache_info()
+            self._show_message("错误", f"清除缓存失败: {error}", QMessageBox.Warning)
     
     def load_settings(self):
-        """加载设置"""
-        # 基本设置
-        self.load_count_spin.setValue(self.config.get('initial_load_count', 100))
-        self.thumbnail_size_spin.setValue(self.config.get('thumbnail_size', 200))
-        self.preview_scale_spin.setValue(self.config.get('preview_scale', 80))
-        self.preview_window_scale_spin.setValue(self.config.get('preview_window_scale', 80))
-        
-        # 外观设置
-        self.border_check.setChecked(self.config.get('image_border', True))
-        self.border_width_spin.setValue(self.config.get('border_width', 2))
-        
-        border_color = QColor(self.config.get('border_color', '#E0E0E0'))
-        self.update_color_button(self.border_color_button, border_color)
-        
-        self.shadow_check.setChecked(self.config.get('image_shadow', True))
-        self.shadow_size_spin.setValue(self.config.get('shadow_size', 5))
-        
-        shadow_color = QColor(self.config.get('shadow_color', '#808080'))
-        self.update_color_button(self.shadow_color_button, shadow_color)
-        
-        self.rounded_check.setChecked(self.config.get('image_rounded', True))
-        self.rounded_size_spin.setValue(self.config.get('rounded_size', 8))
-        
-        # 鼠标悬停设置
-        self.hover_check.setChecked(self.config.get('hover_enabled', True))
-        
-        hover_color = QColor(self.config.get('hover_color', '#e3f2fd'))
-        self.update_color_button(self.hover_color_button, hover_color)
-        
-        hover_border_color = QColor(self.config.get('hover_border_color', '#2196f3'))
-        self.update_color_button(self.hover_border_color_button, hover_border_color)
-        
-        # 视图布局设置
-        self.waterfall_columns_spin.setValue(self.config.get('waterfall_columns', 4))
-        self.grid_columns_spin.setValue(self.config.get('grid_columns', 6))
-        
-        # 性能设置
-        self.cache_size_spin.setValue(self.config.get('cache_size', 3000))
+        """加载设置，只加载已创建的选项卡"""
+        # 丢弃上次未应用的修改（如取消前选择的颜色）
+        self.config = self.config_manager.get_config().copy()
+        
+        v = self._settings_values()
+        with self._hold_updates():
+            self.load_basic_settings(v)
+            if self._is_tab_built(self.APPEARANCE_TAB):
+                self.load_appearance_settings(v)
+            if self._is_tab_built(self.PERFORMANCE_TAB):
+                self.load_performance_settings(v)
+    
+    def _settings_values(self):
+        """合并默认值与当前配置，各加载方法直接按键取值"""
+        return {**self._DEFAULTS, **self.config}
+    
+    def _load_fields(self, v, tab):
+        """加载选项卡中的数值和开关类设置项"""
+        for key, spec in self._FIELD_SPECS.items():
+            if spec[1] != tab:
+                continue
+            widget = self._widgets[key]
+            if isinstance(widget, QCheckBox):
+                widget.setChecked(v[key])
+            else:
+                widget.setValue(v[key])
+    
+    def load_basic_settings(self, v=None):
+        """加载基本设置"""
+        if v is None:
+            v = self._settings_values()
+        self._load_fields(v, self.BASIC_TAB)
+    
+    def load_appearance_settings(self, v=None):
+        """加载外观设置"""
+        if v is None:
+            v = self._settings_values()
+        self._load_fields(v, self.APPEARANCE_TAB)
+        
+        self.update_color_buttons({
+            self.border_color_button: v['border_color'],
+            self.shadow_color_button: v['shadow_color'],
+            self.hover_color_button: v['hover_color'],
+            self.hover_border_color_button: v['hover_border_color'],
+        })
+    
+    def load_performance_settings(self, v=None):
+        """加载性能设置"""
+        if v is None:
+            v = self._settings_values()
+        self._load_fields(v, self.PERFORMANCE_TAB)
         
         # 更新缓存信息
         self.update_cache_info()
     
+    @pyqtSlot()
     def apply_settings(self):
         """应用设置"""
-        # 收集设置
+        # 收集设置，未创建的选项卡没有登记控件，保持原有配置
         self.config.update({
-            'initial_load_count': self.load_count_spin.value(),
-            'thumbnail_size': self.thumbnail_size_spin.value(),
-            'preview_scale': self.preview_scale_spin.value(),
-            'preview_window_scale': self.preview_window_scale_spin.value(),
-            'image_border': self.border_check.isChecked(),
-            'border_width': self.border_width_spin.value(),
-            'image_shadow': self.shadow_check.isChecked(),
-            'shadow_size': self.shadow_size_spin.value(),
-            'image_rounded': self.rounded_check.isChecked(),
-            'rounded_size': self.rounded_size_spin.value(),
-            'hover_enabled': self.hover_check.isChecked(),
-            'waterfall_columns': self.waterfall_columns_spin.value(),
-            'grid_columns': self.grid_columns_spin.value(),
-            'cache_size': self.cache_size_spin.value()
+            key: widget.isChecked() if isinstance(widget, QCheckBox) else widget.value()
+            for key, widget in self._widgets.items()
         })
         
         # 保存设置
         self.config_manager.update_config(self.config)
         
-        QMessageBox.information(self, "完成", "设置已保存")
+        self._show_message("完成", "设置已保存")
     
+    @pyqtSlot()
     def accept(self):
         """确定按钮"""
         self.apply_settings()
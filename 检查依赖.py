@@ -5,54 +5,75 @@
 """
 
 import sys
-import importlib
+import importlib.util
 
-def check_dependencies():
-    """检查所有必要的依赖"""
-    print(" 检查图片管理器依赖库...")
-    print("=" * 50)
-    
-    # 必要的依赖列表
-    required_packages = [
-        ('PyQt5', 'PyQt5'),
-        ('PIL', 'Pillow'),
-        ('rawpy', 'rawpy'),
-        ('numpy', 'numpy'),
-        ('exifread', 'exifread'),
-        ('psutil', 'psutil'),
-        ('send2trash', 'send2trash'),
-        ('cv2', 'opencv-python'),
-        ('imageio', 'imageio'),
-    ]
+# 必要的依赖列表 (模块名, 包名)
+REQUIRED_PACKAGES = (
+    ('PyQt5', 'PyQt5'),
+    ('PIL', 'Pillow'),
+    ('rawpy', 'rawpy'),
+    ('numpy', 'numpy'),
+    ('exifread', 'exifread'),
+    ('psutil', 'psutil'),
+    ('send2trash', 'send2trash'),
+    ('cv2', 'opencv-python'),
+    ('imageio', 'imageio'),
+)
+
+def _probe(package):
+    """检查单个依赖是否已安装，返回 (包名, 是否已安装)"""
+    module_name, package_name = package
+    # 只查找模块位置而不执行模块代码，避免加载cv2、numpy等大型扩展
+    try:
+        return package_name, importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return package_name, False
+
+def _write_lines(lines):
+    """一次写出所有输出行，避免逐行print反复写控制台"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+def check_dependencies(out=None):
+    """检查所有必要的依赖
+    
+    输出行追加到out列表中由调用方统一输出；未传入时在函数结束时一次性输出
+    """
+    lines = [] if out is None else out
+    lines.append(" 检查图片管理器依赖库...")
+    lines.append("=" * 50)
+    
+    # 只查找模块位置，每个依赖仅需几毫秒，逐个检查即可
+    results = [_probe(package) for package in REQUIRED_PACKAGES]
     
     missing_packages = []
     installed_packages = []
     
-    for module_name, package_name in required_packages:
-        try:
-            importlib.import_module(module_name)
-            print(f" {package_name:<15} - 已安装")
+    for package_name, installed in results:
+        if installed:
+            lines.append(f" {package_name:<15} - 已安装")
             installed_packages.append(package_name)
-        except ImportError:
-            print(f" {package_name:<15} - 未安装")
+        else:
+            lines.append(f" {package_name:<15} - 未安装")
             missing_packages.append(package_name)
     
-    print("=" * 50)
-    print(f" 检查结果: {len(installed_packages)}/{len(required_packages)} 个依赖已安装")
+    lines.append("=" * 50)
+    lines.append(f" 检查结果: {len(installed_packages)}/{len(REQUIRED_PACKAGES)} 个依赖已安装")
     
     if missing_packages:
-        print(f"\n 缺少以下依赖:")
+        lines.append(f"\n 缺少以下依赖:")
         for package in missing_packages:
-            print(f"   • {package}")
+            lines.append(f"   • {package}")
         
-        print(f"\n 安装命令:")
+        lines.append(f"\n 安装命令:")
         install_cmd = "pip install " + " ".join(missing_packages)
-        print(f"   {install_cmd}")
-        
-        return False
+        lines.append(f"   {install_cmd}")
     else:
-        print("\n 所有依赖都已正确安装!")
-        return True
+        lines.append("\n 所有依赖都已正确安装!")
+    
+    if out is None:
+        _write_lines(lines)
+    return not missing_packages
 #检查可选依赖  这个也是必选，所以屏蔽掉。mazh-2025-8-5
 #def check_optional_dependencies():
 #    print("\n检查可选依赖...")
@@ -77,36 +98,38 @@ def main():
     if sys.stdout.encoding != 'utf-8':
         sys.stdout.reconfigure(encoding='utf-8')
         
-    print("图片管理器 v5.0 - 依赖检查工具")
-    print("=" * 60)
+    out = []
+    out.append("图片管理器 v5.0 - 依赖检查工具")
+    out.append("=" * 60)
     
     # 检查Python版本
     python_version = sys.version_info
-    print(f"Python版本: {python_version.major}.{python_version.minor}.{python_version.micro}")
+    out.append(f"Python版本: {python_version.major}.{python_version.minor}.{python_version.micro}")
     
     if python_version < (3, 7):
-        print("警告: 建议使用Python 3.7或更高版本")
+        out.append("警告: 建议使用Python 3.7或更高版本")
     else:
-        print("Python版本符合要求")
+        out.append("Python版本符合要求")
     
-    print()
+    out.append("")
     
     # 检查必要依赖
-    all_installed = check_dependencies()
+    all_installed = check_dependencies(out)
     
     # 检查可选依赖
     #check_optional_dependencies()
     
-    print("\n" + "=" * 60)
+    out.append("\n" + "=" * 60)
     
     if all_installed:
-        print(" 依赖检查完成! 可以正常运行图片管理器")
-        print(" 运行命令: python main_v5.0.py")
+        out.append(" 依赖检查完成! 可以正常运行图片管理器")
+        out.append(" 运行命令: python main_v5.0.py")
     else:
-        print(" 存在缺失的依赖，请先安装后再运行")
-        print(" 安装命令: pip install -r requirements.txt")
+        out.append(" 存在缺失的依赖，请先安装后再运行")
+        out.append(" 安装命令: pip install -r requirements.txt")
     
-    print("=" * 60)
+    out.append("=" * 60)
+    _write_lines(out)
     
     return all_installed
 